@@ -0,0 +1,254 @@
+"""
+    Batched transforms and symmetry classification of fixed polyominoes with
+    NumPy.
+
+    A block of size s holds polyominoes of height and width at most s (all
+    polyominoes of order at most s) as an array of shape (B, k) of packed
+    boards: row b is numpy.packbits of the s x s boolean grid of the b-th
+    polyomino, normalized in the top left corner and read row by row.
+
+    The packed board of a polyomino is used as its key: boards compare as
+    bytes, so canonical keys are the maximum board among the images of a
+    polyomino. This order differs from mino_key, so the representatives
+    picked here are not the ones picked by filter.py, but the classes are
+    the same.
+
+    >>> from enumerate import fixed
+    >>> from oeis import A000105, A000988, A030228
+    >>> minos = sorted(fixed(6))
+    >>> classes = classify(block(minos, 6), 6)
+    >>> int((classes.key == classes.free).sum()) == A000105[6]
+    True
+    >>> int((classes.key == classes.one_sided).sum()) == A000988[6]
+    True
+    >>> int(((classes.key == classes.free) & classes.chiral).sum()) == A030228[6]
+    True
+
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+Classification = namedtuple('Classification', ('key', 'one_sided', 'free', 'chiral', 'rotations'))
+Boundary = namedtuple('Boundary', ('cells', 'corners', 'perimeter'))
+
+def block ( minos, size ) :
+
+    """
+        Pack a collection of polyominoes into a block of the given size.
+
+        >>> from polyomino import Polyomino
+        >>> block([Polyomino(frozenset([(0, 0), (1, 0), (1, 1)]))], 2)
+        array([[176]], dtype=uint8)
+
+    """
+
+    minos = list(minos)
+
+    boards = np.zeros((len(minos), size, size), dtype=bool)
+
+    for b, mino in enumerate(minos):
+        for i, j in mino.cells:
+            boards[b, i, j] = True
+
+    return pack(boards)
+
+def pack ( boards ) :
+
+    """
+        Packed block of an array of shape (B, s, s) of boolean boards.
+    """
+
+    return np.packbits(boards.reshape(len(boards), -1), axis=1)
+
+def unpack ( packed, size ) :
+
+    """
+        Array of shape (B, s, s) of boolean boards of a packed block.
+
+        >>> unpack(np.array([[176]], dtype=np.uint8), 2).astype(int).tolist()
+        [[[1, 0], [1, 1]]]
+
+    """
+
+    bits = np.unpackbits(packed, axis=1, count=size*size)
+
+    return bits.reshape(len(packed), size, size).astype(bool)
+
+def shape ( boards ) :
+
+    """
+        Heights and widths of normalized boolean boards.
+    """
+
+    return boards.any(axis=2).sum(axis=1), boards.any(axis=1).sum(axis=1)
+
+def _reverse ( boards, lengths, axis ) :
+
+    # reverse the first lengths[b] rows (axis 1) or columns (axis 2) of each
+    # board, which keeps normalized boards normalized
+    size = boards.shape[axis]
+    index = lengths[:, None] - 1 - np.arange(size)[None, :]
+    valid = index >= 0
+    index = np.where(valid, index, 0)
+
+    if axis == 1:
+        index, valid = index[:, :, None], valid[:, :, None]
+    else:
+        index, valid = index[:, None, :], valid[:, None, :]
+
+    return np.take_along_axis(boards, index, axis=axis) & valid
+
+def images ( boards ) :
+
+    """
+        Array of shape (8, B, s, s) of the images of normalized boolean
+        boards under the transforms, in the order of Polyomino.transforms.
+
+        >>> from polyomino import Polyomino
+        >>> mino = Polyomino(frozenset([(0, 0), (1, 0), (1, 1), (1, 2)]))
+        >>> expected = block(mino.transforms(), 3)
+        >>> got = pack(images(unpack(block([mino], 3), 3)).reshape(8, 3, 3))
+        >>> bool((got == expected).all())
+        True
+
+    """
+
+    h, w = shape(boards)
+
+    transposed = boards.swapaxes(1, 2)
+
+    vert = _reverse(boards, h, 1)
+    horiz = _reverse(boards, w, 2)
+    half = _reverse(vert, w, 2)
+
+    left = _reverse(transposed, w, 1)
+    right = _reverse(transposed, h, 2)
+    skew = _reverse(left, h, 2)
+
+    return np.stack((boards, left, half, right, vert, horiz, transposed, skew))
+
+def keys ( packed ) :
+
+    """
+        Comparable keys (fixed-length bytes) of the rows of a packed block.
+    """
+
+    packed = np.ascontiguousarray(packed)
+
+    return packed.view('S{}'.format(packed.shape[-1])).reshape(packed.shape[:-1])
+
+def _maximum ( keys ) :
+
+    result = keys[0]
+    for other in keys[1:]:
+        result = np.where(other > result, other, result)
+    return result
+
+def classify ( packed, size ) :
+
+    """
+        Keys, canonical keys under rotations and under all transforms,
+        chirality and order of the rotation subgroup fixing each polyomino
+        (1, 2 or 4) of a packed block.
+
+        >>> from polyomino import Polyomino
+        >>> square = Polyomino(frozenset([(0, 0), (0, 1), (1, 0), (1, 1)]))
+        >>> s = Polyomino(frozenset([(0, 1), (0, 2), (1, 0), (1, 1)]))
+        >>> l = Polyomino(frozenset([(0, 0), (1, 0), (2, 0), (2, 1)]))
+        >>> classes = classify(block([square, s, l], 4), 4)
+        >>> classes.chiral.tolist()
+        [False, True, True]
+        >>> classes.rotations.tolist()
+        [4, 2, 1]
+
+    """
+
+    boards = unpack(packed, size)
+
+    transformed = images(boards)
+
+    k = keys(pack(transformed.reshape(-1, size, size))).reshape(8, len(boards))
+
+    identity = k[0]
+
+    return Classification(
+        key=identity,
+        one_sided=_maximum(k[:4]),
+        free=_maximum(k),
+        chiral=(k[4:] != identity).all(axis=0),
+        rotations=(k[:4] == identity).sum(axis=0),
+    )
+
+def boundaries ( packed, size ) :
+
+    """
+        Number of boundary cells (cells with an empty neighbor), number of
+        corners of the boundary and perimeter of each polyomino of a packed
+        block. Holes count toward all three; a vertex shared by two cells
+        touching only by a corner counts as two corners.
+
+        >>> from polyomino import Polyomino
+        >>> square = Polyomino(frozenset([(0, 0), (0, 1), (1, 0), (1, 1)]))
+        >>> l = Polyomino(frozenset([(0, 0), (1, 0), (2, 0), (2, 1)]))
+        >>> ring = Polyomino(frozenset((i, j) for i in range(3) for j in range(3) if (i, j) != (1, 1)))
+        >>> result = boundaries(block([square, l, ring], 3), 3)
+        >>> result.cells.tolist(), result.corners.tolist(), result.perimeter.tolist()
+        ([4, 4, 8], [4, 6, 8], [8, 10, 16])
+
+        >>> from enumerate import fixed_without_holes
+        >>> from grid import boundary, corners
+        >>> minos = sorted(fixed_without_holes(7))
+        >>> result = boundaries(block(minos, 7), 7)
+        >>> result.perimeter.tolist() == [len(boundary(m.cells, m.origin)) for m in minos]
+        True
+        >>> result.corners.tolist() == [len(corners(boundary(m.cells, m.origin))) for m in minos]
+        True
+
+    """
+
+    boards = np.pad(unpack(packed, size), ((0, 0), (1, 1), (1, 1)))
+
+    inner = boards[:, 1:-1, 1:-1]
+
+    surrounded = (inner & boards[:, :-2, 1:-1] & boards[:, 2:, 1:-1]
+                  & boards[:, 1:-1, :-2] & boards[:, 1:-1, 2:])
+
+    perimeter = ((boards[:, 1:] ^ boards[:, :-1]).sum(axis=(1, 2))
+                 + (boards[:, :, 1:] ^ boards[:, :, :-1]).sum(axis=(1, 2)))
+
+    # the four cells around each vertex
+    nw, ne = boards[:, :-1, :-1], boards[:, :-1, 1:]
+    sw, se = boards[:, 1:, :-1], boards[:, 1:, 1:]
+    around = nw.astype(np.int8) + ne + sw + se
+    pinched = (nw == se) & (ne == sw) & (nw != ne)
+
+    return Boundary(
+        cells=(inner & ~surrounded).sum(axis=(1, 2)),
+        corners=((around & 1) + 2 * pinched).sum(axis=(1, 2)),
+        perimeter=perimeter,
+    )
+
+def blocks ( minos, size, length=4096 ) :
+
+    """
+        Split an iterable of polyominoes into packed blocks of at most length
+        polyominoes.
+
+        >>> from enumerate import _fixed
+        >>> list(map(len, blocks(_fixed(4), 4, length=8)))
+        [8, 8, 3]
+
+    """
+
+    chunk = []
+
+    for mino in minos:
+        chunk.append(mino)
+        if len(chunk) == length:
+            yield block(chunk, size)
+            chunk = []
+
+    if chunk:
+        yield block(chunk, size)
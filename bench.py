@@ -0,0 +1,245 @@
+"""
+    Benchmarks of the counts, the filters and the table.
+
+    Each benchmark runs for one order in a fresh interpreter (the same
+    executable, CPython or PyPy) so that caches start cold and the peak
+    resident set size is its own. A result holds the wall time, the number
+    of polyominoes produced or processed and their rate, the peak RSS in
+    KiB, and the time of each phase.
+
+        python bench.py --orders 8 10 -o results.json
+        python bench.py --orders 8 10 --baseline results.json --threshold 0.1
+
+    With --baseline, the run fails if a benchmark is slower than in the
+    baseline by more than the threshold.
+
+    >>> result = measure('count.fixed', 6)
+    >>> result['items'], sorted(result)
+    (216, ['items', 'phases', 'rate', 'rss', 'seconds'])
+
+    >>> baseline = {'count.fixed': {'10': {'seconds': 1.0}}}
+    >>> current = {'count.fixed': {'10': {'seconds': 1.5}}, 'count.free': {'10': {'seconds': 1.0}}}
+    >>> compare(current, baseline, 0.2)
+    [('count.fixed', '10', 1.5)]
+
+"""
+
+import io
+import os
+import sys
+import json
+import platform
+import subprocess
+
+from time import perf_counter
+from contextlib import redirect_stdout
+
+import count
+import filter
+import table
+import stats
+
+from enumerate import _fixed
+from enumerate import _fixed_without_holes
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def _count ( function ) :
+
+    def run ( n ) :
+        start = perf_counter()
+        items = function(n)
+        return items, {'count': perf_counter() - start}
+
+    return run
+
+def _filter ( function, source=_fixed ) :
+
+    def run ( n ) :
+        start = perf_counter()
+        minos = list(source(n))
+        middle = perf_counter()
+        for _ in function(minos): pass
+        return len(minos), {'input': middle - start, 'filter': perf_counter() - middle}
+
+    return run
+
+def _table ( n ) :
+
+    """
+        Print the table up to order n. The items are the fixed n-ominoes,
+        read from the last row, and the phases are the timers of the
+        counted columns and of the passes, since the columns of a pass
+        share its time.
+
+        >>> items, phases = _table(5)
+        >>> items, sorted(phases)
+        (63, ['chiral', 'fixed', 'free', 'one-sided'])
+
+    """
+
+    output = io.StringIO()
+
+    stats.enable()
+
+    try:
+        with redirect_stdout(output):
+            table.main(max_order=n, columns=table.DEFAULT_COLUMNS)
+        # the filters are timed within their pass
+        phases = {name: seconds for name, seconds in stats.snapshot()['timers'].items() if not name.startswith('filter ')}
+    finally:
+        stats.disable()
+
+    header, *rows = output.getvalue().splitlines()
+    titles = [title.strip() for title in header.split(',')]
+    last = [value.strip() for value in rows[-1].split(',')]
+
+    return int(last[titles.index('fixed')]), phases
+
+BENCHMARKS = {
+    'count.fixed': _count(count.fixed),
+    'count.free': _count(count.free),
+    'count.one_sided': _count(count.one_sided),
+    'count.chiral': _count(count.chiral),
+    'count.without_holes': _count(count.without_holes),
+    'count.free_without_holes_with_odd_side_length': _count(count.free_without_holes_with_odd_side_length),
+    'filter._filter_chiral': _filter(filter._filter_chiral),
+    'filter._filter_one_sided': _filter(filter._filter_one_sided),
+    'filter._filter_one_sided_mem': _filter(filter._filter_one_sided_mem),
+    'filter._filter_free': _filter(filter._filter_free),
+    'filter._filter_free_mem': _filter(filter._filter_free_mem),
+    'filter._filter_without_holes': _filter(filter._filter_without_holes),
+    'filter._filter_with_holes': _filter(filter._filter_with_holes),
+    'filter._filter_with_odd_side_lengths': _filter(filter._filter_with_odd_side_lengths, _fixed_without_holes),
+    'table.main': _table,
+}
+
+def _rss ( ) :
+
+    # peak resident set size in KiB, ru_maxrss is in bytes on macOS
+    if resource is None: return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+def measure ( name, n ) :
+
+    """
+        Run a benchmark for order n in this process.
+    """
+
+    start = perf_counter()
+    items, phases = BENCHMARKS[name](n)
+    seconds = perf_counter() - start
+
+    return {
+        'seconds': seconds,
+        'items': items,
+        'rate': items / seconds if seconds > 0 else None,
+        'rss': _rss(),
+        'phases': phases,
+    }
+
+def isolated ( name, n ) :
+
+    """
+        Run a benchmark for order n in a fresh interpreter.
+    """
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, os.path.join(here, 'bench.py'), '--measure', name, str(n)]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, cwd=here).stdout
+
+    return json.loads(output)
+
+def suite ( names, orders, repeat=1 ) :
+
+    """
+        Results of the benchmarks for each order, keeping the fastest of
+        repeat runs, keyed by name then order.
+    """
+
+    results = {}
+
+    for name in names:
+        for n in orders:
+            runs = [isolated(name, n) for _ in range(repeat)]
+            results.setdefault(name, {})[str(n)] = min(runs, key=lambda r: r['seconds'])
+
+    return results
+
+def compare ( results, baseline, threshold ) :
+
+    """
+        Benchmarks slower than in the baseline by more than threshold (a
+        fraction of the baseline time), as (name, order, ratio) triples.
+        Benchmarks missing from the baseline are ignored.
+    """
+
+    slower = []
+
+    for name, orders in sorted(results.items()):
+        for n, result in sorted(orders.items(), key=lambda item: int(item[0])):
+            reference = baseline.get(name, {}).get(n)
+            if reference is None or reference['seconds'] <= 0: continue
+            ratio = result['seconds'] / reference['seconds']
+            if ratio > 1 + threshold:
+                slower.append((name, n, ratio))
+
+    return slower
+
+def environment ( ) :
+
+    return {
+        'implementation': platform.python_implementation(),
+        'version': platform.python_version(),
+        'machine': platform.machine(),
+    }
+
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the counts, the filters and the table.')
+    parser.add_argument('--benchmarks', nargs='+', default=tuple(BENCHMARKS), choices=tuple(BENCHMARKS), help='benchmarks to run')
+    parser.add_argument('--orders', nargs='+', type=int, default=[8], help='orders to run the benchmarks for')
+    parser.add_argument('--repeat', type=int, default=1, help='number of runs, the fastest is kept')
+    parser.add_argument('-o', '--output', help='file where the results are written as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1, help='tolerated slowdown as a fraction of the baseline time')
+    parser.add_argument('--measure', nargs=2, metavar=('BENCHMARK', 'ORDER'), help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.measure is not None:
+        name, n = args.measure
+        json.dump(measure(name, int(n)), sys.stdout)
+        sys.exit(0)
+
+    results = {}
+
+    for name in args.benchmarks:
+        for n in args.orders:
+            result = suite([name], [n], repeat=args.repeat)[name][str(n)]
+            results.setdefault(name, {})[str(n)] = result
+            rss = '-' if result['rss'] is None else '{}KiB'.format(result['rss'])
+            rate = '-' if result['rate'] is None else '{:.3g}/s'.format(result['rate'])
+            print('{} {}: {:.3g}s {} {}'.format(name, n, result['seconds'], rate, rss), flush=True)
+
+    if args.output is not None:
+        with open(args.output, 'w') as fp:
+            json.dump({'environment': environment(), 'results': results}, fp, indent=2)
+
+    if args.baseline is not None:
+
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)['results']
+
+        slower = compare(results, baseline, args.threshold)
+
+        for name, n, ratio in slower:
+            print('{} {}: {:.2f}x slower than the baseline'.format(name, n, ratio))
+
+        if slower: sys.exit(1)
@@ -0,0 +1,239 @@
+"""
+    Canonical forms of polyominoes under the rotation group and the full
+    dihedral group.
+
+    The key of a polyomino is mino_key: (order, height, width, bits) where
+    bits packs the cells column by column, cell (i, j) being bit i + j*height.
+    The canonical key of a class is the maximum key of its members, which is
+    the representative the filters output.
+
+    >>> from polyomino import Polyomino
+    >>> from polyomino import mino_key
+    >>> mino = Polyomino(frozenset([(0, 0), (1, 0), (1, 1), (1, 2)]))
+    >>> list(transform_keys(mino)) == list(map(mino_key, mino.transforms()))
+    True
+    >>> one_sided_key(mino) == mino_key(max(mino.rotations()))
+    True
+    >>> free_key(mino) == mino_key(max(mino.transforms()))
+    True
+    >>> is_chiral(mino)
+    True
+
+"""
+
+from functools import lru_cache
+
+ROTATIONS = 4
+
+TRANSFORMS = 8
+
+@lru_cache(maxsize=None)
+def _transform_bits ( h, w ) :
+
+    """
+        For each bit position i + j*h of the h x w box, the bits that cell
+        (i, j) is sent to by each transform, in the order of
+        Polyomino.transforms.
+
+        >>> _transform_bits(1, 2)
+        ((1, 2, 2, 1, 1, 2, 1, 2), (2, 1, 1, 2, 2, 1, 2, 1))
+
+    """
+
+    def bits ( i, j ) :
+        return (
+            1 << (i + j*h),
+            1 << ((w-1-j) + i*w),
+            1 << ((h-1-i) + (w-1-j)*h),
+            1 << (j + (h-1-i)*w),
+            1 << ((h-1-i) + j*h),
+            1 << (i + (w-1-j)*h),
+            1 << (j + i*w),
+            1 << ((w-1-j) + (h-1-i)*w),
+        )
+
+    return tuple(bits(i, j) for j in range(w) for i in range(h))
+
+def _transform_keys ( n, h, w, bits ) :
+
+    table = _transform_bits(h, w)
+
+    k0 = k1 = k2 = k3 = k4 = k5 = k6 = k7 = 0
+
+    while bits:
+        low = bits & -bits
+        t = table[low.bit_length() - 1]
+        k0 |= t[0]
+        k1 |= t[1]
+        k2 |= t[2]
+        k3 |= t[3]
+        k4 |= t[4]
+        k5 |= t[5]
+        k6 |= t[6]
+        k7 |= t[7]
+        bits ^= low
+
+    return (
+        (n, h, w, k0),
+        (n, w, h, k1),
+        (n, h, w, k2),
+        (n, w, h, k3),
+        (n, h, w, k4),
+        (n, h, w, k5),
+        (n, w, h, k6),
+        (n, w, h, k7),
+    )
+
+def _box_bits ( n ) :
+
+    # cells of the largest box of an n-omino, which has h + w <= n + 1
+    return (n + 1) // 2 * ((n + 2) // 2)
+
+def compact_key ( n, h, w, bits ) :
+
+    """
+        The key (n, h, w, bits) as a single integer that sorts the same way:
+        h and w take as many bits as n and the packed cells a field as wide
+        as the largest box of an n-omino, so that keys of larger orders are
+        longer. It hashes and compares faster than the tuple and takes half
+        its memory.
+
+        >>> keys = [(4, 1, 4, 15), (4, 2, 3, 30), (4, 3, 2, 27), (5, 1, 5, 31), (0, 0, 0, 0)]
+        >>> sorted(keys, key=lambda key: compact_key(*key)) == sorted(keys)
+        True
+
+    """
+
+    size = n.bit_length()
+    return ((n << size | h) << size | w) << _box_bits(n) | bits
+
+def _key_bits ( n ) :
+
+    # bits of the compact keys of the n-ominoes
+    return 3 * n.bit_length() + _box_bits(n)
+
+def _key_size ( n ) :
+
+    """
+        Number of bytes that hold the compact key of any n-omino, at least
+        one so that records of the empty polyomino are not empty.
+
+        >>> list(map(_key_size, range(8)))
+        [1, 1, 1, 2, 2, 3, 3, 4]
+
+    """
+
+    return max(1, (_key_bits(n) + 7) // 8)
+
+def split_key ( n, key ) :
+
+    """
+        The key (n, h, w, bits) of a compact key of an n-omino.
+
+        >>> split_key(4, compact_key(4, 2, 3, 30))
+        (4, 2, 3, 30)
+        >>> split_key(40, compact_key(40, 33, 8, 1 << 263)) == (40, 33, 8, 1 << 263)
+        True
+
+    """
+
+    size = n.bit_length()
+    box = _box_bits(n)
+    mask = (1 << size) - 1
+
+    return (n, key >> (box + size) & mask, key >> box & mask, key & ((1 << box) - 1))
+
+_cached_transform_keys = lru_cache(maxsize=2**16)(_transform_keys)
+
+def set_cache_size ( maxsize ) :
+
+    """
+        Replace the cache of transform keys by an empty one holding at most
+        maxsize entries (None for unbounded, 0 to disable caching).
+
+        >>> from polyomino import Polyomino
+        >>> set_cache_size(4)
+        >>> _ = free_key(Polyomino(frozenset([(0, 0)])))
+        >>> _ = free_key(Polyomino(frozenset([(0, 0)])))
+        >>> cache_info()
+        CacheInfo(hits=1, misses=1, maxsize=4, currsize=1)
+        >>> set_cache_size(2**16)
+
+    """
+
+    global _cached_transform_keys
+    _cached_transform_keys = lru_cache(maxsize=maxsize)(_transform_keys)
+
+def cache_info ( ) :
+
+    """
+        Hits, misses, maxsize and current size of the cache of transform
+        keys.
+    """
+
+    return _cached_transform_keys.cache_info()
+
+def transform_keys ( mino ) :
+
+    """
+        Keys of the eight transforms of mino, in the order of
+        Polyomino.transforms, computed in a single pass over its cells.
+    """
+
+    return _cached_transform_keys(mino.order, mino.height, mino.width, mino.bits)
+
+def one_sided_key ( mino ) :
+
+    """
+        Canonical key of mino under rotations.
+    """
+
+    return max(transform_keys(mino)[:ROTATIONS])
+
+def free_key ( mino ) :
+
+    """
+        Canonical key of mino under rotations and reflections.
+    """
+
+    return max(transform_keys(mino))
+
+def is_one_sided_canonical ( mino ) :
+
+    """
+        Whether mino has the largest key among its rotations, which holds
+        for exactly one fixed polyomino of each one-sided polyomino.
+    """
+
+    keys = transform_keys(mino)
+    return keys[0] == max(keys[:ROTATIONS])
+
+def is_free_canonical ( mino ) :
+
+    """
+        Whether mino has the largest key among its transforms, which holds
+        for exactly one fixed polyomino of each free polyomino.
+
+        >>> from polyomino import Polyomino
+        >>> l = Polyomino(frozenset([(0, 0), (1, 0), (1, 1)]))
+        >>> sum(map(is_free_canonical, set(l.transforms())))
+        1
+
+    """
+
+    keys = transform_keys(mino)
+    return keys[0] == max(keys)
+
+def is_chiral ( mino ) :
+
+    """
+        Whether mino is different from each of its reflections.
+
+        >>> from polyomino import Polyomino
+        >>> is_chiral(Polyomino(frozenset([(0, 0), (1, 0), (1, 1)])))
+        False
+
+    """
+
+    keys = transform_keys(mino)
+    return keys[0] not in keys[ROTATIONS:]
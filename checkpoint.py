@@ -0,0 +1,70 @@
+"""
+    Persist the progress of long-running computations to a local file.
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'checkpoint.json')
+    >>> load(path) is None
+    True
+    >>> save(path, {'rows': {'0': {'order': 0}}})
+    >>> load(path)
+    {'rows': {'0': {'order': 0}}}
+
+"""
+
+import os
+import json
+import time
+
+def load ( path ) :
+
+    """
+        Return the state saved at path or None if there is none.
+    """
+
+    try:
+        with open(path) as fp:
+            return json.load(fp)
+    except FileNotFoundError:
+        return None
+
+def save ( path, state ) :
+
+    """
+        Replace the state saved at path. The new state is written to a
+        temporary file first so that a kill never leaves a truncated file.
+    """
+
+    tmp = path + '.tmp'
+
+    with open(tmp, 'w') as fp:
+        json.dump(state, fp)
+
+    os.replace(tmp, path)
+
+class Periodic:
+
+    """
+        Save states to path at most once every interval seconds.
+
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'checkpoint.json')
+        >>> persist = Periodic(path, 3600)
+        >>> persist({'done': 1})
+        >>> load(path) is None
+        True
+        >>> persist({'done': 2}, force=True)
+        >>> load(path)
+        {'done': 2}
+
+    """
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self.last = time.monotonic()
+
+    def __call__(self, state, force=False):
+        now = time.monotonic()
+        if force or now - self.last >= self.interval:
+            save(self.path, state)
+            self.last = now
@@ -1,4 +1,7 @@
 import enumerate
+import symmetry
+import transfer
+from functools import lru_cache
 
 def cardinality ( iterable ) :
 
@@ -8,7 +11,9 @@ def cardinality ( iterable ) :
         return sum(map(lambda x: 1, iterable))
 
 
-def fixed(n):
+METHODS = ('redelmeier', 'transfer')
+
+def fixed(n, workers=None, method='redelmeier', shard=0, nshards=1):
 
     """
 
@@ -18,11 +23,96 @@ def fixed(n):
         >>> all(map(lambda n: fixed(n) == A001168[n], range(10)))
         True
 
+        >>> fixed(9, workers=2)
+        9910
+
+        >>> fixed(16, method='transfer') == A001168[16]
+        True
+
+        With nshards > 1, only count the part of the search that belongs to
+        shard, see shard.py.
+
+        >>> sum(fixed(9, shard=i, nshards=3) for i in range(3))
+        9910
+
+    """
+
+    return fixed_orders(n, workers=workers, method=method, shard=shard, nshards=nshards)[n]
+
+def fixed_orders(n, workers=None, state=None, persist=None, method='redelmeier', shard=0, nshards=1):
+
     """
+        Count the fixed k-ominoes for k = 0, ..., n in a single search,
+        optionally split across a pool of worker processes. The search can be
+        checkpointed with persist and resumed from state, see
+        enumerate._redelmeier_counts_split.
+
+        With method='transfer' the counts are computed with the
+        transfer-matrix method instead, see transfer.py.
 
-    return cardinality(enumerate._redelmeier(n))
+        >>> fixed_orders(5)
+        [1, 1, 2, 6, 19, 63]
 
-def free(n):
+        >>> fixed_orders(5, method='transfer')
+        [1, 1, 2, 6, 19, 63]
+
+    """
+
+    if method == 'transfer':
+        if workers is not None or state is not None or persist is not None or nshards != 1:
+            raise ValueError('the transfer method runs on a single process without checkpoints nor shards')
+        return transfer._transfer_counts(n)
+
+    if method != 'redelmeier':
+        raise ValueError('unknown method {}'.format(method))
+
+    if workers is None and state is None and persist is None and nshards == 1:
+        return enumerate._redelmeier_counts(n)
+
+    return enumerate._redelmeier_counts_split(n, workers=workers, state=state, persist=persist,
+            shard=shard, nshards=nshards)
+
+@lru_cache(maxsize=None)
+def symmetric(n, kind):
+
+    """
+        Count the fixed n-ominoes invariant under the given transform, one of
+        symmetry.SYMMETRIES.
+
+        >>> symmetric(8, 'rotate_left')
+        3
+
+    """
+
+    return cardinality(symmetry._symmetric_cells(n, kind))
+
+def _one_sided(n, fixed_count):
+
+    # Burnside's lemma for the rotation group, where rotating left or right
+    # fixes the same polyominoes
+    r90 = symmetric(n, 'rotate_left')
+    r180 = symmetric(n, 'rotate_half')
+
+    return (fixed_count + 2*r90 + r180) // 4
+
+def _free(n, fixed_count):
+
+    # Burnside's lemma for the dihedral group, where conjugate reflections fix
+    # the same number of polyominoes
+    r90 = symmetric(n, 'rotate_left')
+    r180 = symmetric(n, 'rotate_half')
+    axis = symmetric(n, 'reflect_horiz')
+    diag = symmetric(n, 'reflect_diag')
+
+    return (fixed_count + 2*r90 + r180 + 2*axis + 2*diag) // 8
+
+def _chiral(n, fixed_count):
+
+    return _one_sided(n, fixed_count) - _free(n, fixed_count)
+
+FREE_METHODS = ('burnside', 'orderly')
+
+def free(n, workers=None, method='burnside'):
 
     """
 
@@ -30,11 +120,32 @@ def free(n):
         >>> all(map(lambda n: free(n) == A000105[n], range(10)))
         True
 
+        >>> free(13) == A000105[13]
+        True
+
+        With method='orderly' the free polyominoes are enumerated one per
+        class instead, see enumerate._free_orderly.
+
+        >>> free(9, method='orderly') == A000105[9]
+        True
+        >>> free(5, method='bogus')
+        Traceback (most recent call last):
+        ...
+        ValueError: unknown method bogus
+
     """
 
-    return cardinality(enumerate._free_mem(n))
+    if method not in FREE_METHODS:
+        raise ValueError('unknown method {}'.format(method))
+
+    if method == 'orderly':
+        if workers is not None:
+            raise ValueError('the orderly method runs on a single process')
+        return cardinality(enumerate._free_orderly(n))
+
+    return _free(n, fixed(n, workers=workers))
 
-def one_sided(n):
+def one_sided(n, workers=None):
 
     """
 
@@ -44,9 +155,9 @@ def one_sided(n):
 
     """
 
-    return cardinality(enumerate._one_sided_mem(n))
+    return _one_sided(n, fixed(n, workers=workers))
 
-def chiral(n):
+def chiral(n, workers=None):
 
     """
 
@@ -56,7 +167,7 @@ def chiral(n):
 
     """
 
-    return cardinality(enumerate._chiral_mem(n))
+    return _chiral(n, fixed(n, workers=workers))
 
 def with_holes(n):
 
@@ -1,5 +1,6 @@
 from polyomino import Polyomino
 from polyomino import empty
+from polyomino import singleton
 from filter import _filter_free
 from filter import _filter_free_mem
 from filter import _filter_one_sided
@@ -8,8 +9,32 @@ from filter import _filter_chiral
 from filter import _filter_with_holes
 from filter import _filter_without_holes
 from filter import _filter_with_odd_side_lengths
+from symmetry import _symmetric_cells
 from grid import neighbors
+from grid import _neighbors
 from grid import normalize
+from grid import pack
+from grid import _translate
+from grid import _fill
+from grid import children as _children
+from grid import neighborhood
+from grid import augment
+from grid import _padded
+from canonical import TRANSFORMS
+from canonical import _transform_bits
+from canonical import _transform_keys
+from canonical import _key_bits
+from canonical import compact_key
+from canonical import split_key
+from hashset import PackedSet
+from functools import lru_cache
+from itertools import repeat
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from oeis import A001168
+
+import stats
 
 def _redelmeier_routine(p, parent, untried, forbidden):
 
@@ -39,6 +64,631 @@ def _redelmeier(n):
 
     return _redelmeier_routine(n, frozenset(), [(0,0)], frozenset())
 
+@lru_cache(maxsize=None)
+def _redelmeier_layout(n):
+
+    """
+        Number the cells of the bounded Redelmeier half-plane for order n.
+
+        The region is 2n-1 cells wide and n cells high. Cell (i, j) with
+        -n < i < n and 0 <= j < n gets bit position j*(2n-1) + i+n-1 and only
+        exists if j >= 1 or i >= 0. Returns the coordinates of each position
+        and, for each position, the positions of its neighbours inside the
+        region.
+
+        >>> coordinates, adjacency = _redelmeier_layout(2)
+        >>> coordinates
+        ((-1, 0), (0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+        >>> adjacency[1]
+        (4, 2)
+
+    """
+
+    w = 2*n - 1
+
+    coordinates = tuple((i - n + 1, j) for j in range(n) for i in range(w))
+
+    def position(cell):
+        i, j = cell
+        if -n < i < n and 0 <= j < n and (j >= 1 or i >= 0):
+            return j*w + i + n - 1
+        return None
+
+    adjacency = tuple(
+        tuple(p for p in map(position, _neighbors(cell)) if p is not None)
+        for cell in coordinates
+    )
+
+    return coordinates, adjacency
+
+def _redelmeier_bits_routine(p, path, untried, seen, adjacency):
+
+    """
+        Same search as _redelmeier_routine with cells encoded as bit
+        positions. path and untried are shared stacks that each call restores
+        before returning, seen is the int bitmask of parent | untried |
+        forbidden.
+    """
+
+    if p == 0:
+        yield path
+        return
+
+    popped = []
+
+    while untried:
+
+        nbr = untried.pop()
+        popped.append(nbr)
+
+        top = len(untried)
+        child_seen = seen
+
+        for x in adjacency[nbr]:
+            if not child_seen >> x & 1:
+                child_seen |= 1 << x
+                untried.append(x)
+
+        path.append(nbr)
+        yield from _redelmeier_bits_routine(p-1, path, untried, child_seen, adjacency)
+        path.pop()
+
+        del untried[top:]
+
+    popped.reverse()
+    untried.extend(popped)
+
+def _redelmeier_bits(n, shard=0, nshards=1):
+
+    """
+        Enumerate the fixed n-ominoes with Redelmeier's algorithm on a
+        bitboard.
+
+        >>> from oeis import A001168
+        >>> from count import cardinality
+        >>> all(map(lambda n: cardinality(_redelmeier_bits(n)) == A001168[n], range(10)))
+        True
+
+        >>> sorted(_redelmeier_bits(4)) == sorted(_redelmeier(4))
+        True
+
+        With nshards > 1, only the subtrees of shard are searched, see
+        _redelmeier_shard. Shards are disjoint and cover all polyominoes.
+
+        >>> shards = [list(_redelmeier_bits(7, i, 3)) for i in range(3)]
+        >>> sorted(sum(shards, [])) == sorted(_redelmeier_bits(7))
+        True
+
+    """
+
+    if n == 0:
+        if shard == 0: yield empty
+        return
+
+    coordinates, adjacency = _redelmeier_layout(n)
+    origin = n - 1
+
+    if nshards == 1:
+        paths = _redelmeier_bits_routine(n, [], [origin], 1 << origin, adjacency)
+
+    else:
+        depth = _redelmeier_shard_depth(n, nshards)
+        frontier = _redelmeier_frontier(n, depth, [0] * (n+1))
+        paths = (path
+            for prefix, p, untried, seen in _redelmeier_shard(frontier, shard, nshards)
+            for path in _redelmeier_bits_routine(p, list(prefix), list(untried), seen, adjacency))
+
+    for path in paths:
+        yield _redelmeier_polyomino(coordinates, path)
+
+def _redelmeier_orders_routine(p, path, untried, seen, adjacency):
+
+    """
+        Same search as _redelmeier_bits_routine but yields the path of every
+        node, so each fixed k-omino for k <= p once, parents first.
+    """
+
+    popped = []
+
+    while untried:
+
+        nbr = untried.pop()
+        popped.append(nbr)
+
+        path.append(nbr)
+
+        yield path
+
+        if p > 1:
+
+            top = len(untried)
+            child_seen = seen
+
+            for x in adjacency[nbr]:
+                if not child_seen >> x & 1:
+                    child_seen |= 1 << x
+                    untried.append(x)
+
+            yield from _redelmeier_orders_routine(p-1, path, untried, child_seen, adjacency)
+
+            del untried[top:]
+
+        path.pop()
+
+    popped.reverse()
+    untried.extend(popped)
+
+def _redelmeier_orders(n):
+
+    """
+        Enumerate the fixed k-ominoes for all k <= n with a single search of
+        depth n: the nodes of the search at depth k are the k-ominoes.
+
+        >>> from oeis import A001168
+        >>> from collections import Counter
+        >>> orders = Counter(mino.order for mino in _redelmeier_orders(9))
+        >>> [orders[k] for k in range(10)] == list(A001168[:10])
+        True
+        >>> sorted(mino for mino in _redelmeier_orders(6) if mino.order == 5) == sorted(_redelmeier_bits(5))
+        True
+
+    """
+
+    yield empty
+
+    if n == 0: return
+
+    coordinates, adjacency = _redelmeier_layout(n)
+    origin = n - 1
+
+    for path in _redelmeier_orders_routine(n, [], [origin], 1 << origin, adjacency):
+        yield _redelmeier_polyomino(coordinates, path)
+
+def _redelmeier_polyomino(coordinates, path):
+
+    # the origin is the lowest cell in the second coordinate
+    cells = [coordinates[x] for x in path]
+    rows, cols = zip(*cells)
+    imin = min(rows)
+    height = max(rows) - imin + 1
+    return Polyomino.from_bits(pack(height, _translate(cells, -imin, 0)), height, max(cols) + 1)
+
+def _redelmeier_counts_routine(p, untried, seen, adjacency, counts):
+
+    """
+        Same search as _redelmeier_bits_routine but only counts nodes. Every
+        node at depth d is a fixed d-omino, so counts[d] is incremented once
+        per node. The last level is never expanded: each untried cell is a
+        leaf.
+    """
+
+    d = len(counts) - p
+
+    if p == 1:
+        counts[d] += len(untried)
+        return
+
+    popped = []
+
+    while untried:
+
+        nbr = untried.pop()
+        popped.append(nbr)
+
+        counts[d] += 1
+
+        top = len(untried)
+        child_seen = seen
+
+        for x in adjacency[nbr]:
+            if not child_seen >> x & 1:
+                child_seen |= 1 << x
+                untried.append(x)
+
+        _redelmeier_counts_routine(p-1, untried, child_seen, adjacency, counts)
+
+        del untried[top:]
+
+    popped.reverse()
+    untried.extend(popped)
+
+def _redelmeier_counts(n):
+
+    """
+        Count the fixed k-ominoes for all k <= n with a single Redelmeier
+        search of depth n.
+
+        >>> from oeis import A001168
+        >>> list(A001168[:12]) == _redelmeier_counts(11)
+        True
+
+        >>> _redelmeier_counts(0)
+        [1]
+
+    """
+
+    counts = [1] + [0] * n
+
+    if n > 0:
+        _, adjacency = _redelmeier_layout(n)
+        origin = n - 1
+        _redelmeier_counts_routine(n, [origin], 1 << origin, adjacency, counts)
+
+    if stats.ENABLED: stats.add('redelmeier nodes', sum(counts))
+
+    return counts
+
+def _redelmeier_frontier_routine(p, q, path, untried, seen, adjacency, counts):
+
+    """
+        Expand the first q levels of the counting search and yield the state
+        (path, p, untried, seen) of each node at that depth. Nodes above the
+        frontier are counted in counts, the frontier nodes included.
+    """
+
+    if q == 0:
+        yield (tuple(path), p, tuple(untried), seen)
+        return
+
+    d = len(counts) - p
+
+    popped = []
+
+    while untried:
+
+        nbr = untried.pop()
+        popped.append(nbr)
+
+        counts[d] += 1
+
+        top = len(untried)
+        child_seen = seen
+
+        for x in adjacency[nbr]:
+            if not child_seen >> x & 1:
+                child_seen |= 1 << x
+                untried.append(x)
+
+        path.append(nbr)
+        yield from _redelmeier_frontier_routine(p-1, q-1, path, untried, child_seen, adjacency, counts)
+        path.pop()
+
+        del untried[top:]
+
+    popped.reverse()
+    untried.extend(popped)
+
+def _redelmeier_frontier(n, depth, counts):
+
+    """
+        Yield the states of the nodes at the given depth of the search for
+        order n. See _redelmeier_frontier_routine.
+    """
+
+    _, adjacency = _redelmeier_layout(n)
+    origin = n - 1
+
+    return _redelmeier_frontier_routine(n, depth, [], [origin], 1 << origin, adjacency, counts)
+
+def _redelmeier_counts_subtree(n, state):
+
+    """
+        Count the nodes strictly below a frontier state, per depth.
+    """
+
+    _, p, untried, seen = state
+    _, adjacency = _redelmeier_layout(n)
+
+    counts = [0] * (n+1)
+    _redelmeier_counts_routine(p, list(untried), seen, adjacency, counts)
+
+    return counts
+
+def _redelmeier_split_depth(n, workers):
+
+    """
+        Smallest frontier depth with at least SUBTREES_PER_WORKER subtrees per
+        worker. The frontier at depth d has A001168(d) nodes.
+
+        >>> _redelmeier_split_depth(15, 1)
+        6
+        >>> _redelmeier_split_depth(15, 64)
+        9
+        >>> _redelmeier_split_depth(3, 64)
+        2
+
+    """
+
+    depth = 0
+    while depth < n - 1 and A001168[depth] < SUBTREES_PER_WORKER * workers:
+        depth += 1
+
+    return depth
+
+SUBTREES_PER_WORKER = 64
+
+def _redelmeier_shard_depth(n, nshards):
+
+    """
+        Frontier depth used to shard the search for order n, which only
+        depends on n and nshards so that all shards agree on it.
+
+        >>> _redelmeier_shard_depth(15, 8)
+        7
+
+    """
+
+    return min(_redelmeier_split_depth(n, nshards), n-1)
+
+def _redelmeier_shard(frontier, shard, nshards):
+
+    """
+        The frontier states that belong to shard: every nshards-th state of
+        the frontier in search order, starting at index shard. The search
+        order is deterministic so a shard can be rerun on its own.
+
+        >>> list(_redelmeier_shard(range(10), 1, 4))
+        [1, 5, 9]
+
+    """
+
+    if not 0 <= shard < nshards:
+        raise ValueError('shard {} is not in range({})'.format(shard, nshards))
+
+    return islice(frontier, shard, None, nshards)
+
+def _redelmeier_counts_split(n, workers=None, depth=None, state=None, persist=None, shard=0, nshards=1):
+
+    """
+        Same as _redelmeier_counts but the search is expanded down to a
+        frontier and the subtrees below it are counted one after the other,
+        on a pool of worker processes if workers is given. Subtrees are handed
+        out one at a time so that idle workers pick up the remaining ones.
+
+        >>> _redelmeier_counts_split(9, 2) == _redelmeier_counts(9)
+        True
+
+        >>> _redelmeier_counts_split(9, 2, depth=20) == _redelmeier_counts(9)
+        True
+
+        >>> _redelmeier_counts_split(1, 2)
+        [1, 1]
+
+        After each subtree, persist is called with a state from which the
+        count can be resumed: the order, the frontier depth, the number of
+        subtrees done, the path to the next subtree, and the counts below the
+        subtrees done so far.
+
+        >>> states = []
+        >>> _redelmeier_counts_split(6, depth=3, persist=states.append)
+        [1, 1, 2, 6, 19, 63, 216]
+        >>> states[2]
+        {'order': 6, 'depth': 3, 'done': 3, 'path': [5, 16, 15], 'counts': [0, 0, 0, 0, 9, 29, 97]}
+        >>> _redelmeier_counts_split(6, state=states[2])
+        [1, 1, 2, 6, 19, 63, 216]
+
+        With nshards > 1, only the subtrees of shard are counted, and the
+        nodes above the frontier are counted by shard 0 only, so that the
+        counts of all shards sum to the total. The states then also hold the
+        shard and the number of shards.
+
+        >>> shards = [_redelmeier_counts_split(9, shard=i, nshards=4) for i in range(4)]
+        >>> list(map(sum, zip(*shards))) == _redelmeier_counts(9)
+        True
+
+    """
+
+    counts = [1] + [0] * n
+
+    if n == 0: return counts if shard == 0 else [0]
+
+    if state is not None:
+        if state['order'] != n:
+            raise ValueError('cannot resume order {} from a state for order {}'.format(n, state['order']))
+        if (state.get('shard', 0), state.get('nshards', 1)) != (shard, nshards):
+            raise ValueError('cannot resume shard {} of {} from another shard'.format(shard, nshards))
+        depth = state['depth']
+    elif depth is None:
+        depth = _redelmeier_split_depth(n, workers or 1) if nshards == 1 else _redelmeier_shard_depth(n, nshards)
+
+    depth = min(depth, n-1)
+
+    frontier = list(_redelmeier_shard(_redelmeier_frontier(n, depth, counts), shard, nshards))
+
+    if shard != 0: counts = [0] * (n+1)
+
+    done = 0
+    below = [0] * (n+1)
+
+    if state is not None:
+        done = state['done']
+        below = list(state['counts'])
+        if done < len(frontier) and list(frontier[done][0]) != state['path']:
+            raise ValueError('state does not match the search for order {}'.format(n))
+
+    subtrees = frontier[done:]
+
+    with ExitStack() as stack:
+
+        if workers is None:
+            partials = map(_redelmeier_counts_subtree, repeat(n), subtrees)
+        else:
+            executor = stack.enter_context(ProcessPoolExecutor(workers))
+            partials = executor.map(_redelmeier_counts_subtree, repeat(n), subtrees)
+
+        for partial in partials:
+
+            for d, c in enumerate(partial):
+                below[d] += c
+
+            done += 1
+
+            if persist is not None:
+                progress = {
+                    'order': n,
+                    'depth': depth,
+                    'done': done,
+                    'path': list(frontier[done][0]) if done < len(frontier) else None,
+                    'counts': list(below),
+                }
+                if nshards > 1:
+                    progress.update(shard=shard, nshards=nshards)
+                persist(progress)
+
+    total = [a + b for a, b in zip(counts, below)]
+
+    if stats.ENABLED: stats.add('redelmeier nodes', sum(total))
+
+    return total
+
+@lru_cache(maxsize=None)
+def _redelmeier_padded_layout(n):
+
+    """
+        Number the cells of the Redelmeier half-plane for order n inside a
+        box with an empty border, so that holes can be found by flood
+        filling the box from its corner. The box is 2n+1 cells wide and n+2
+        cells high and cell (i, j) gets bit position (j+1)*(2n+1) + i+n.
+        Returns the coordinates of each position (None outside of the
+        half-plane), the positions of the neighbours of each position inside
+        the half-plane, the stride of the box and the mask of the box.
+
+        >>> coordinates, adjacency, stride, box = _redelmeier_padded_layout(1)
+        >>> coordinates[4], adjacency[4], stride, box
+        ((0, 0), (), 3, 511)
+
+    """
+
+    stride = 2*n + 1
+    size = stride * (n+2)
+
+    def cell(x):
+        i, j = x % stride - n, x // stride - 1
+        if -n < i < n and 0 <= j < n and (j >= 1 or i >= 0):
+            return (i, j)
+        return None
+
+    def position(cell):
+        i, j = cell
+        return (j+1)*stride + i + n
+
+    coordinates = tuple(map(cell, range(size)))
+
+    adjacency = tuple(
+        () if c is None else tuple(p for p in map(position, _neighbors(c)) if p < size and coordinates[p] is not None)
+        for c in coordinates
+    )
+
+    return coordinates, adjacency, stride, (1 << size) - 1
+
+def _redelmeier_without_holes_routine(p, path, untried, seen, parent, available, holes, layout):
+
+    """
+        Same search as _redelmeier_bits_routine that also keeps the cells of
+        the holes of parent and the cells still available (untried). A branch
+        is pruned as soon as its holes can no longer be filled: they are
+        larger than the remaining budget or contain a cell that was already
+        rejected.
+    """
+
+    if p == 0:
+        if not holes: yield path
+        return
+
+    _, adjacency, stride, box = layout
+
+    popped = []
+
+    while untried:
+
+        nbr = untried.pop()
+        popped.append(nbr)
+
+        bit = 1 << nbr
+        available &= ~bit
+
+        child = parent | bit
+        child_holes = holes & ~bit
+
+        pattern = (
+            (child >> (nbr - stride - 1)) & 7 |
+            ((child >> (nbr - 1)) & 7) << 3 |
+            ((child >> (nbr + stride - 1)) & 7) << 6
+        )
+
+        if ENCLOSES[pattern]:
+            empty = box & ~child
+            child_holes = empty & ~_fill(1, empty, stride)
+
+        top = len(untried)
+        child_seen = seen
+
+        for x in adjacency[nbr]:
+            if not child_seen >> x & 1:
+                child_seen |= 1 << x
+                untried.append(x)
+
+        child_available = available | (child_seen & ~seen)
+
+        if not child_holes or (
+                bin(child_holes).count('1') <= p - 1 and
+                not child_holes & child_seen & ~child & ~child_available):
+            path.append(nbr)
+            yield from _redelmeier_without_holes_routine(p-1, path, untried, child_seen, child, child_available, child_holes, layout)
+            path.pop()
+
+        del untried[top:]
+
+    popped.reverse()
+    untried.extend(popped)
+
+def _encloses(pattern):
+
+    """
+        Whether filling the center of a 3x3 pattern (bit 3*r + c for row r
+        and column c) may split the empty cells around it, that is, whether
+        its empty sides are not all connected through its empty corners.
+
+        >>> _encloses(0b000000000), _encloses(0b010000010), _encloses(0b000000010)
+        (False, True, False)
+
+    """
+
+    ring = (5, 8, 7, 6, 3, 0, 1, 2)
+    empty = [not pattern >> y & 1 for y in ring]
+
+    sides = sum(empty[0::2])
+    joined = sum(empty[k] and empty[k+1] and empty[(k+2) % 8] for k in range(0, 8, 2))
+
+    return sides - joined >= 2
+
+ENCLOSES = tuple(map(_encloses, range(512)))
+
+def _redelmeier_without_holes(n):
+
+    """
+        Enumerate the fixed n-ominoes without holes with Redelmeier's
+        algorithm, pruning the branches whose holes cannot be filled.
+
+        >>> from filter import _filter_without_holes
+        >>> all(map(lambda n: frozenset(_redelmeier_without_holes(n)) == frozenset(_filter_without_holes(fixed(n))), range(10)))
+        True
+
+    """
+
+    if n == 0:
+        yield empty
+        return
+
+    layout = _redelmeier_padded_layout(n)
+    coordinates = layout[0]
+    origin = coordinates.index((0, 0))
+
+    bit = 1 << origin
+
+    for path in _redelmeier_without_holes_routine(n, [], [origin], bit, 0, bit, 0, layout):
+        yield _redelmeier_polyomino(coordinates, path)
+
 def childset(minos):
 
     """
@@ -50,17 +700,87 @@ def childset(minos):
         children.update(mino.children())
     return children
 
+# a level is about Klarner's constant times larger than the one before it
+GROWTH = 4.1
+
+def _level_key(mino):
+    return mino.key
+
+def _level_polyomino(order, key):
+    _, h, w, bits = split_key(order, key)
+    return Polyomino.from_bits(bits, h, w)
+
+def _level_words(n):
+    # machine words in the compact keys of the n-ominoes
+    return (_key_bits(n) + 63) // 64
+
+class _Level:
+
+    """
+        The fixed polyominoes of one order as compact keys in a PackedSet,
+        see canonical.compact_key, decoded when iterated over.
+
+        >>> level = _Level(2, map(_level_key, fixed(2)))
+        >>> len(level), sorted(level) == sorted(fixed(2)), singleton in level
+        (2, True, False)
+
+    """
+
+    __slots__ = ('order', 'keys')
+
+    def __init__(self, order, keys=(), capacity=8):
+        self.order = order
+        self.keys = PackedSet(_level_words(order), capacity)
+        self.keys.update(keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __iter__(self):
+        return map(_level_polyomino, repeat(self.order), self.keys)
+
+    def __contains__(self, mino):
+        return mino.order == self.order and _level_key(mino) in self.keys
+
+def _children_level(level):
+
+    """
+        Level of the children of the polyominoes of a level. Children are
+        generated from the keys with bit operations and deduplicated by the
+        hash set, sized beforehand for the whole level. The fields of the
+        keys grow with the order, so heights and widths never overflow.
+
+        >>> bar = Polyomino.from_bits((1 << 33) - 1, 33, 1)
+        >>> level = _children_level(_Level(33, [_level_key(bar)]))
+        >>> sorted(level) == sorted(bar.children())
+        True
+
+    """
+
+    order = level.order
+    children = _Level(order + 1, capacity=int(GROWTH * len(level)) + 8)
+    add = children.keys.add
+
+    for key in level.keys:
+        _, h, w, bits = split_key(order, key)
+        for child_h, child_w, child_bits in _children(h, w, bits):
+            add(compact_key(order + 1, child_h, child_w, child_bits))
+
+    return children
+
 def _fixed_with_offset(offset):
 
-    init = fixed(offset)
-    yield from _fixed_with_init(init)
+    init = _fixed(offset)
+    yield from _fixed_with_init(init, offset)
+
+def _fixed_with_init(minos, order):
 
-def _fixed_with_init(minos):
+    # Iteratively add the children of the members of the level before it
+    level = _Level(order, map(_level_key, minos))
 
-    # Iteratively add the children of the members of the set before it
     while True:
-        yield minos
-        minos = childset(minos)
+        yield level
+        level = _children_level(level)
 
 def _fixed_gen():
 
@@ -74,9 +794,9 @@ def _fixed_gen():
 
     """
 
-    return _fixed_with_init({empty})
+    return _fixed_with_init({empty}, 0)
 
-_fixed = _redelmeier
+_fixed = _redelmeier_bits
 
 def fixed(n):
 
@@ -90,6 +810,122 @@ def fixed(n):
 
     return frozenset(_fixed(n))
 
+def _symmetric(n, kind):
+    return map(Polyomino, map(normalize, _symmetric_cells(n, kind)))
+
+def symmetric(n, kind):
+
+    """
+        The fixed n-ominoes invariant under the given transform, one of
+        symmetry.SYMMETRIES.
+
+        >>> from symmetry import SYMMETRIES
+        >>> all(symmetric(n, kind) == frozenset(m for m in fixed(n) if getattr(m, kind)() == m)
+        ...     for n in range(8) for kind in SYMMETRIES)
+        True
+
+    """
+
+    return frozenset(_symmetric(n, kind))
+
+def _is_connected_bits(h, w, bits):
+
+    padded = _padded(h, w, bits)
+    return _fill(padded & -padded, padded, h + 2) == padded
+
+def _canonical_deletion(h, w, bits):
+
+    """
+        Position of the last cell of packed cells whose removal leaves them
+        connected.
+
+        >>> _canonical_deletion(1, 3, 0b111)
+        2
+        >>> _canonical_deletion(2, 2, 0b0111)
+        2
+
+    """
+
+    position = bits.bit_length()
+
+    while True:
+        position -= 1
+        if bits >> position & 1 and _is_connected_bits(h, w, bits ^ 1 << position):
+            return position
+
+def _free_orderly_routine(p, h, w, bits):
+
+    """
+        Children of a free polyomino by canonical augmentation: add one cell
+        per orbit of the neighbors under the automorphisms of the parent,
+        and keep the child when the added cell is in the orbit of its
+        canonical deletion, the last removable cell of its canonical form.
+        Yield the canonical forms of the descendants p levels down.
+    """
+
+    n = bin(bits).count('1')
+
+    parent = _transform_keys(n, h, w, bits)
+    automorphisms = [t for t in range(TRANSFORMS) if parent[t] == parent[0]]
+
+    # automorphisms of the cells are automorphisms of the padded box
+    around = _transform_bits(h+2, w+2)
+
+    candidates = neighborhood(h, w, bits)
+
+    while candidates:
+
+        low = candidates & -candidates
+        candidates ^= low
+        position = low.bit_length() - 1
+
+        images = around[position]
+        if any(images[t] < low for t in automorphisms): continue
+
+        child_h, child_w, child, added = augment(h, w, bits, position)
+
+        keys = _transform_keys(n+1, child_h, child_w, child)
+        key = max(keys)
+        _, height, width, canonical = key
+
+        deletion = 1 << _canonical_deletion(height, width, canonical)
+        table = _transform_bits(child_h, child_w)[added]
+
+        if not any(keys[t] == key and table[t] == deletion for t in range(TRANSFORMS)):
+            continue
+
+        if p == 1:
+            yield height, width, canonical
+        else:
+            yield from _free_orderly_routine(p-1, height, width, canonical)
+
+def _free_orderly(n):
+
+    """
+        Enumerate the free n-ominoes, each as its canonical form, by
+        canonical augmentation: no fixed polyomino is generated twice and
+        only one transform of each free polyomino is ever visited.
+
+        >>> from oeis import A000105
+        >>> from count import cardinality
+        >>> all(map(lambda n: cardinality(_free_orderly(n)) == A000105[n], range(11)))
+        True
+        >>> sorted(_free_orderly(7)) == sorted(_free_mem(7))
+        True
+
+    """
+
+    if n == 0:
+        yield empty
+        return
+
+    if n == 1:
+        yield singleton
+        return
+
+    for h, w, bits in _free_orderly_routine(n-1, 1, 1, 1):
+        yield Polyomino.from_bits(bits, h, w)
+
 def _free_mem(n):
     return _filter_free_mem(_fixed(n))
 
@@ -165,11 +1001,25 @@ def with_holes(n):
 
     return frozenset(_with_holes(n))
 
+_fixed_without_holes = _redelmeier_without_holes
+
+def fixed_without_holes(n):
+
+    """
+
+        >>> from oeis import A000104
+        >>> all(map(lambda n: len(frozenset(_filter_free_mem(fixed_without_holes(n)))) == A000104[n], range(8)))
+        True
+
+    """
+
+    return frozenset(_fixed_without_holes(n))
+
 def _without_holes(n):
-    return _filter_without_holes(_free(n))
+    return _filter_free(_fixed_without_holes(n))
 
 def _without_holes_mem(n):
-    return _filter_without_holes(_free_mem(n))
+    return _filter_free_mem(_fixed_without_holes(n))
 
 def without_holes(n):
 
@@ -0,0 +1,165 @@
+"""
+    External-memory breadth-first generation of fixed polyominoes.
+
+    The children of the polyominoes of a level are generated in chunks; each
+    chunk is deduplicated, sorted and written to a scratch directory as a
+    run of store records. The next level is the k-way merge of the runs,
+    without duplicates, written as a store. Records of one order are compact
+    keys of fixed width and sort by mino_key, so the merge compares raw
+    bytes and only a chunk and one record per run are ever in memory.
+
+    >>> import tempfile
+    >>> from oeis import A001168
+    >>> it = levels(1, tempfile.mkdtemp(), chunk=100)
+    >>> all(map(lambda n: len(next(it)) == A001168[n], range(1, 9)))
+    True
+
+    >>> from enumerate import fixed
+    >>> directory = tempfile.mkdtemp()
+    >>> it = levels(6, directory, chunk=50)
+    >>> list(next(it)) == sorted(fixed(6)), list(next(it)) == sorted(fixed(7))
+    (True, True)
+    >>> import os
+    >>> sorted(os.listdir(directory))
+    ['fixed-6.bin', 'fixed-7.bin']
+
+"""
+
+import os
+import heapq
+import tempfile
+
+import store
+
+from enumerate import _fixed
+from grid import children
+from canonical import compact_key
+
+CHUNK = 1 << 20
+BLOCK = 1 << 12
+
+def _write_run ( directory, records ) :
+
+    fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+
+    with os.fdopen(fd, 'wb') as fp:
+        fp.write(b''.join(sorted(records)))
+
+    return path
+
+def _read_run ( path, width ) :
+
+    with open(path, 'rb') as fp:
+        while True:
+            block = fp.read(width * BLOCK)
+            if not block: return
+            for start in range(0, len(block), width):
+                yield block[start:start+width]
+
+def _runs ( records, directory, chunk ) :
+
+    # sorted runs of at most chunk distinct records
+    paths = []
+    distinct = set()
+
+    for record in records:
+
+        distinct.add(record)
+
+        if len(distinct) >= chunk:
+            paths.append(_write_run(directory, distinct))
+            distinct = set()
+
+    if distinct or not paths:
+        paths.append(_write_run(directory, distinct))
+
+    return paths
+
+def runs ( minos, order, directory, chunk=CHUNK ) :
+
+    """
+        Write the children of minos, of the given order, to sorted runs of
+        at most chunk distinct records in directory. Return their paths.
+    """
+
+    size = store._key_size(order)
+
+    records = (
+        compact_key(order, h, w, bits).to_bytes(size, 'big')
+        for mino in minos
+        for h, w, bits in children(mino.height, mino.width, mino.bits)
+    )
+
+    return _runs(records, directory, chunk)
+
+def _unique ( records ) :
+
+    previous = None
+
+    for record in records:
+        if record != previous:
+            yield record
+            previous = record
+
+def sort ( records, width, directory, chunk=CHUNK ) :
+
+    """
+        Sort an iterable of records of the given width without duplicates,
+        holding at most chunk of them in memory: sorted runs are written to
+        directory, merged as the result is consumed, and removed at the end.
+
+        >>> import tempfile
+        >>> records = (bytes((i % 7, i % 5)) for i in range(100))
+        >>> result = list(sort(records, 2, tempfile.mkdtemp(), chunk=4))
+        >>> result == sorted(set(bytes((i % 7, i % 5)) for i in range(100)))
+        True
+
+    """
+
+    paths = _runs(records, directory, chunk)
+
+    try:
+        yield from _unique(heapq.merge(*(_read_run(run, width) for run in paths)))
+    finally:
+        for run in paths: os.remove(run)
+
+def merge ( paths, path, order ) :
+
+    """
+        Merge sorted runs of records of the given order into a store at path,
+        dropping duplicates. Return the number of polyominoes.
+    """
+
+    width = store._key_size(order)
+
+    merged = heapq.merge(*(_read_run(run, width) for run in paths))
+
+    return store.write_records(path, _unique(merged), order, 'fixed')
+
+def levels ( offset, directory, chunk=CHUNK ) :
+
+    """
+        Yield the stores of the fixed polyominoes of orders offset, offset+1,
+        ... written to directory, each one built from the last with sorted
+        runs of at most chunk records. Levels are kept as catalogs that
+        store.cached finds; runs are removed once merged.
+    """
+
+    path = store.filename(directory, offset, 'fixed')
+    store.write(path, _fixed(offset), offset, 'fixed')
+
+    order = offset
+
+    while True:
+
+        with store.Store(path) as level:
+
+            yield level
+
+            order += 1
+            path = store.filename(directory, order, 'fixed')
+
+            paths = runs(level, order, directory, chunk)
+            merge(paths, path, order)
+
+        for run in paths: os.remove(run)
@@ -1,20 +1,30 @@
-from functools import lru_cache
-from grid import is_connected
-from grid import boundary
-from grid import corners
-from grid import _boundary_lengths
-from debug import debug
+from grid import has_holes
+from grid import has_odd_sides
+from canonical import one_sided_key
+from canonical import free_key
+from canonical import is_chiral
+from canonical import is_one_sided_canonical
+from canonical import is_free_canonical
+from canonical import compact_key
+from polyomino import Polyomino
+
+def _representative ( key ) :
+    # the polyomino of a canonical key, instead of the max of its transforms
+    _, h, w, bits = key
+    return Polyomino.from_bits(bits, h, w)
+
+def _is_without_holes ( mino ) :
+    return not has_holes(mino.height, mino.width, mino.bits)
+
+def _is_with_holes ( mino ) :
+    return has_holes(mino.height, mino.width, mino.bits)
+
+def _has_odd_side_lengths ( mino ) :
+    return has_odd_sides(mino.height, mino.width, mino.bits)
 
 def _filter_chiral(minos):
 
-    for mino in minos:
-
-        if mino == mino.reflect_vert(): continue
-        if mino == mino.reflect_horiz(): continue
-        if mino == mino.reflect_diag(): continue
-        if mino == mino.reflect_skew(): continue
-
-        yield mino
+    return filter(is_chiral, minos)
 
 def _filter_one_sided(minos, sort=True):
 
@@ -22,15 +32,16 @@ def _filter_one_sided(minos, sort=True):
         Remove rotations in set of minos (with history).
     """
 
-    vis = set() # visited mino rotation families
+    vis = set() # canonical keys of visited mino rotation families
     for mino in minos:
         # If we haven't seen a rotation of this mino before,
-        # add its rotations to the visisted list
-        if mino not in vis:
-            mino_rots = mino.rotations()
-            vis.update(mino_rots)
+        # add its family to the visisted list
+        key = one_sided_key(mino)
+        packed = compact_key(*key)
+        if packed not in vis:
+            vis.add(packed)
             # Add the (maximal rotation of the) mino
-            yield max(mino_rots) if sort else mino
+            yield _representative(key) if sort else mino
 
 def _filter_one_sided_mem(minos):
 
@@ -40,26 +51,23 @@ def _filter_one_sided_mem(minos):
         hyp: minos has no duplicates
     """
 
-    for mino in minos:
-        if mino < mino.rotate_left(): continue
-        if mino < mino.rotate_half(): continue
-        if mino < mino.rotate_right(): continue
-        # If this mino is maximum amoung its rotations, output it
-        yield mino
+    # Output the minos that are maximum amoung their rotations
+    return filter(is_one_sided_canonical, minos)
 
 def _filter_free(minos, sort=True):
     """
         Remove rotations and reflections in the set of minos (with history).
     """
-    vis = set() # visited transformation families
+    vis = set() # canonical keys of visited transformation families
     for mino in minos:
         # If we haven't seen a rotation or reflection of this mino before,
-        # add its transforms to the visisted list
-        if mino not in vis:
-            mino_trans = mino.transforms()
-            vis.update(mino_trans)
+        # add its family to the visisted list
+        key = free_key(mino)
+        packed = compact_key(*key)
+        if packed not in vis:
+            vis.add(packed)
             # Add the (maximal transform of the) mino
-            yield max(mino_trans) if sort else mino
+            yield _representative(key) if sort else mino
 
 def _filter_free_mem(minos):
 
@@ -69,38 +77,8 @@ def _filter_free_mem(minos):
         hyp: minos has no duplicates
     """
 
-    for mino in minos:
-
-        if mino < mino.rotate_left(): continue
-        if mino < mino.rotate_half(): continue
-        if mino < mino.rotate_right(): continue
-
-        if mino < mino.reflect_vert(): continue
-        if mino < mino.reflect_horiz(): continue
-        if mino < mino.reflect_diag(): continue
-        if mino < mino.reflect_skew(): continue
-
-        # If this mino is maximum amoung its transformations, output it
-        yield mino
-
-@lru_cache(maxsize=None)
-def whole_grid ( h, w ) :
-    return set((x,y) for x in range(-1,h+1) for y in range(-1,w+1))
-
-@lru_cache(maxsize=None)
-def has_topological_property ( condition ) :
-
-    def _cnd ( mino ) :
-
-        antimino = whole_grid(mino.height, mino.width) - mino.cells
-
-        return condition(antimino)
-
-    return _cnd
-
-def _filter_holes ( condition , minos ) :
-
-    return filter(has_topological_property(condition), minos)
+    # Output the minos that are maximum amoung their transformations
+    return filter(is_free_canonical, minos)
 
 def _filter_without_holes ( minos ) :
 
@@ -108,7 +86,7 @@ def _filter_without_holes ( minos ) :
         Check if outside of polyomino is connected. If not, there is a hole.
     """
 
-    return _filter_holes(is_connected, minos)
+    return filter(_is_without_holes, minos)
 
 def _filter_with_holes ( minos ) :
 
@@ -116,32 +94,22 @@ def _filter_with_holes ( minos ) :
         Check if outside of polyomino is disconnected. If it is, there is no hole.
     """
 
-    return _filter_holes(lambda x : not is_connected(x), minos)
+    return filter(_is_with_holes, minos)
 
 def _filter_with_odd_side_lengths ( minos ):
 
-    for mino in minos:
-
-        debug('polyomino')
-        debug('=========')
-        debug(mino)
-        debug('=========')
-        debug(mino.cells)
-
-        b = boundary(mino.cells, mino.origin)
-
-        debug(b)
+    """
+        Keep the polyominoes whose sides all have odd length.
 
-        c = corners(b)
+        hyp: minos have no holes
 
-        debug(c)
+        >>> from enumerate import fixed_without_holes
+        >>> from grid import boundary, corners, _boundary_lengths
+        >>> minos = fixed_without_holes(8)
+        >>> walked = set(m for m in minos if all(x % 2 for x in _boundary_lengths(corners(boundary(m.cells, m.origin)))))
+        >>> set(_filter_with_odd_side_lengths(minos)) == walked
+        True
 
-        if all(map(lambda x: x % 2, _boundary_lengths(c))):
-            debug('OK')
-            debug('polyomino')
-            debug('=========')
-            debug(mino)
-            debug('=========')
-            yield mino
+    """
 
-        debug('#####################################')
+    return filter(_has_odd_side_lengths, minos)
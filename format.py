@@ -1,4 +1,10 @@
+import os
 import json
+import importlib
+
+from grid import pack
+from canonical import split_key
+from canonical import _key_size
 
 def grid(h, w, cells):
 
@@ -96,3 +102,202 @@ def to_json(mino, **kwargs):
     """
 
     return json.dumps(to_json_object(mino), **kwargs)
+
+# [Streaming export]
+
+FORMATS = ('csv', 'jsonl', 'bitstring', 'binary')
+
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.txt': 'bitstring',
+    '.bin': 'binary',
+}
+
+COMPRESSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'lzma',
+}
+
+CSV_HEADER = 'order,height,width,bits\n'
+
+CHUNK = 1 << 16
+
+def _positions(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+def _bitstring_line(mino):
+    # same as to_bitstring, read from the packed bits
+    h, w = mino.height, mino.width
+    columns = format(mino.bits, '0{}b'.format(h*w))[::-1] if h*w else ''
+    return '{} {} {}\n'.format(h, w, ''.join(columns[i::h] for i in range(h)))
+
+def _csv_line(mino):
+    return '{},{},{},{}\n'.format(mino.order, mino.height, mino.width, mino.bits)
+
+def _jsonl_line(mino):
+    # same as to_json, without going through json.dumps
+    h = mino.height
+    cells = sorted(divmod(p, h)[::-1] for p in _positions(mino.bits))
+    return '{{"height": {}, "width": {}, "cells": [{}]}}\n'.format(
+            h, mino.width, ', '.join('[{}, {}]'.format(*cell) for cell in cells))
+
+def _binary_record(mino):
+    # order, then the compact key as in stores
+    n = mino.order
+    return bytes((n,)) + mino.key.to_bytes(_key_size(n), 'big')
+
+LINES = {
+    'csv': _csv_line,
+    'jsonl': _jsonl_line,
+    'bitstring': _bitstring_line,
+    'binary': _binary_record,
+}
+
+def _guess(path, fmt, compression):
+
+    """
+        Format and compression of path, from its extensions unless given.
+
+        >>> _guess('free-12.jsonl.gz', None, None)
+        ('jsonl', 'gzip')
+        >>> _guess('free-12.out', 'csv', None)
+        ('csv', None)
+
+    """
+
+    root, extension = os.path.splitext(path)
+
+    if extension in COMPRESSIONS:
+        if compression is None: compression = COMPRESSIONS[extension]
+        root, extension = os.path.splitext(root)
+
+    if fmt is None:
+        try:
+            fmt = EXTENSIONS[extension]
+        except KeyError:
+            raise ValueError('cannot guess the format of {}'.format(path))
+
+    if fmt not in FORMATS:
+        raise ValueError('unknown format {}'.format(fmt))
+
+    return fmt, compression
+
+def _open(path, mode, compression):
+
+    if compression is None:
+        return open(path, mode)
+
+    return importlib.import_module(compression).open(path, mode)
+
+def dump(minos, path, fmt=None, compression=None, chunk=CHUNK):
+
+    """
+        Write an iterable of polyominoes to path in one of FORMATS, possibly
+        compressed with one of the stdlib modules of COMPRESSIONS. Both are
+        guessed from the extensions of path if not given. Polyominoes are
+        formatted from their packed bits and written in chunks, so that
+        minos can be a generator of any length. Return the number of
+        polyominoes written.
+
+        >>> import os, tempfile
+        >>> from enumerate import _fixed
+        >>> directory = tempfile.mkdtemp()
+        >>> for name in ('a.csv', 'a.jsonl.gz', 'a.txt.bz2', 'a.bin.xz'):
+        ...     path = os.path.join(directory, name)
+        ...     assert dump(_fixed(6), path, chunk=100) == 216
+        ...     assert list(load(path)) == list(_fixed(6))
+
+        >>> from polyomino import Polyomino
+        >>> l = Polyomino(frozenset([(0, 0), (1, 0), (1, 1)]))
+        >>> _jsonl_line(l) == to_json(l) + '\\n'
+        True
+        >>> _bitstring_line(l) == to_bitstring(l) + '\\n'
+        True
+
+    """
+
+    fmt, compression = _guess(path, fmt, compression)
+
+    line = LINES[fmt]
+    binary = fmt == 'binary'
+
+    count = 0
+
+    with _open(path, 'wb' if binary else 'wt', compression) as fp:
+
+        if fmt == 'csv': fp.write(CSV_HEADER)
+
+        buffer = []
+
+        for mino in minos:
+            buffer.append(line(mino))
+            if len(buffer) == chunk:
+                fp.write((b'' if binary else '').join(buffer))
+                count += len(buffer)
+                buffer = []
+
+        fp.write((b'' if binary else '').join(buffer))
+        count += len(buffer)
+
+    return count
+
+def load(path, fmt=None, compression=None):
+
+    """
+        Stream the polyominoes of a file written by dump.
+    """
+
+    from polyomino import Polyomino
+
+    fmt, compression = _guess(path, fmt, compression)
+
+    if fmt == 'binary':
+
+        with _open(path, 'rb', compression) as fp:
+            while True:
+                order = fp.read(1)
+                if not order: return
+                n = order[0]
+                _, h, w, bits = split_key(n, int.from_bytes(fp.read(_key_size(n)), 'big'))
+                yield Polyomino.from_bits(bits, h, w)
+
+    with _open(path, 'rt', compression) as fp:
+
+        if fmt == 'csv':
+            next(fp)
+            for line in fp:
+                _, h, w, bits = map(int, line.split(','))
+                yield Polyomino.from_bits(bits, h, w)
+
+        elif fmt == 'bitstring':
+            for line in fp:
+                h, w, rows = (line.rstrip('\n').split(' ') + [''])[:3]
+                h, w = int(h), int(w)
+                yield Polyomino.from_bits(pack(h, (divmod(p, w) for p, c in enumerate(rows) if c == '1')), h, w)
+
+        else:
+            for line in fp:
+                obj = json.loads(line)
+                yield Polyomino.from_bits(pack(obj['height'], obj['cells']), obj['height'], obj['width'])
+
+if __name__ == '__main__':
+
+    import argparse
+
+    import store
+
+    parser = argparse.ArgumentParser(description='Export the polyominoes of a given order.')
+    parser.add_argument('--kind', choices=tuple(store.KINDS), default='fixed', help='class of polyominoes')
+    parser.add_argument('--order', type=int, required=True, help='order of the polyominoes')
+    parser.add_argument('-f', '--format', choices=FORMATS, help='output format (guessed from the extension by default)')
+    parser.add_argument('--compression', choices=tuple(COMPRESSIONS.values()), help='output compression (guessed from the extension by default)')
+    parser.add_argument('-o', '--output', required=True, help='output file')
+
+    args = parser.parse_args()
+
+    dump(store.KINDS[args.kind](args.order), args.output, args.format, args.compression)
@@ -1,5 +1,5 @@
 from collections import Counter
-from debug import debug
+from itertools import chain
 
 def _translate(cells, numrows, numcols):
     return ((i+numrows, j+numcols) for i, j in cells)
@@ -21,6 +21,268 @@ def normalize ( cells ) :
 
     return translate(cells, -imin, -jmin)
 
+def pack ( h, cells ) :
+
+    """
+        Pack normalized cells column by column with height h: cell (i, j)
+        is bit i + j*h.
+
+        >>> pack(2, [(0, 0), (1, 1)])
+        9
+
+    """
+
+    bits = 0
+    for i, j in cells:
+        bits |= 1 << (i + j*h)
+    return bits
+
+def unpack ( h, bits ) :
+
+    """
+        Cells packed in bits with height h.
+
+        >>> sorted(unpack(2, 9))
+        [(0, 0), (1, 1)]
+
+    """
+
+    while bits:
+        low = bits & -bits
+        position = low.bit_length() - 1
+        yield (position % h, position // h)
+        bits ^= low
+
+def _padded ( h, w, bits ) :
+
+    """
+        Repack cells packed with height h into a box with an empty border,
+        of height h+2.
+
+        >>> _padded(1, 1, 1)
+        16
+
+    """
+
+    column = (1 << h) - 1
+    stride = h + 2
+
+    padded = 0
+    for j in range(w):
+        padded |= ((bits >> (j*h)) & column) << (1 + (j+1)*stride)
+
+    return padded
+
+def _fill ( seed, region, stride ) :
+
+    """
+        Flood fill region from seed, shifting the whole front at once.
+    """
+
+    while True:
+        grown = (seed | seed << 1 | seed >> 1 | seed << stride | seed >> stride) & region
+        if grown == seed: return seed
+        seed = grown
+
+def holes ( h, w, bits ) :
+
+    """
+        Number of holes and their total area for cells packed with height h
+        and width w. The outside of the cells is flood filled from a corner of
+        a box with an empty border; what remains of the complement is made of
+        holes.
+
+        >>> holes(3, 3, 0b111101111)
+        (1, 1)
+        >>> holes(4, 4, 0b1111100110011111)
+        (1, 4)
+        >>> holes(2, 2, 0b1111)
+        (0, 0)
+
+    """
+
+    stride = h + 2
+    box = (1 << (stride * (w+2))) - 1
+
+    empty = box & ~_padded(h, w, bits)
+    enclosed = empty & ~_fill(1, empty, stride)
+
+    area = bin(enclosed).count('1')
+
+    count = 0
+    while enclosed:
+        enclosed &= ~_fill(enclosed & -enclosed, enclosed, stride)
+        count += 1
+
+    return count, area
+
+def has_holes ( h, w, bits ) :
+
+    """
+        Whether cells packed with height h and width w enclose a hole.
+
+        >>> has_holes(3, 3, 0b111101111)
+        True
+        >>> has_holes(3, 3, 0b111100111)
+        False
+
+    """
+
+    stride = h + 2
+    box = (1 << (stride * (w+2))) - 1
+
+    empty = box & ~_padded(h, w, bits)
+
+    return _fill(1, empty, stride) != empty
+
+def neighborhood ( h, w, bits ) :
+
+    """
+        Empty neighbors of cells packed with height h and width w, as bits of
+        the padded box of height h+2 (see _padded).
+
+        >>> neighborhood(1, 1, 1)
+        170
+
+    """
+
+    stride = h + 2
+    box = (1 << (stride * (w+2))) - 1
+
+    padded = _padded(h, w, bits)
+
+    return (padded << 1 | padded >> 1 | padded << stride | padded >> stride) & box & ~padded
+
+def augment ( h, w, bits, position ) :
+
+    """
+        Add to cells packed with height h and width w the neighbor at the
+        given position of the padded box. Return the height, width and bits
+        of the result and the position of the new cell in it. Only a new row
+        above or below the cells needs the columns to be repacked.
+
+        >>> augment(1, 1, 1, 1)
+        (1, 2, 3, 0)
+        >>> augment(1, 1, 1, 5)
+        (2, 1, 3, 1)
+
+    """
+
+    j, i = divmod(position, h + 2)
+
+    if 1 <= i <= h:
+        if j == 0:
+            return (h, w+1, bits << h | 1 << (i-1), i-1)
+        added = i-1 + (j-1)*h
+        return (h, max(w, j), bits | 1 << added, added)
+
+    height = h + 1
+    top = 1 if i == 0 else 0
+
+    repacked = 0
+    for c in range(w):
+        repacked |= ((bits >> (c*h)) & ((1 << h) - 1)) << (c*height + top)
+
+    added = (j-1)*height + (0 if top else h)
+
+    return (height, w, repacked | 1 << added, added)
+
+def children ( h, w, bits ) :
+
+    """
+        Cells obtained by adding one neighbor to cells packed with height h
+        and width w, as (height, width, bits) triples.
+
+        >>> sorted(children(1, 1, 1))
+        [(1, 2, 3), (1, 2, 3), (2, 1, 3), (2, 1, 3)]
+        >>> sorted(children(0, 0, 0))
+        [(1, 1, 1)]
+        >>> len(set(children(2, 2, 0b1011)))
+        7
+
+    """
+
+    if not bits:
+        yield (1, 1, 1)
+        return
+
+    around = neighborhood(h, w, bits)
+
+    while around:
+        low = around & -around
+        around ^= low
+        yield augment(h, w, bits, low.bit_length() - 1)[:3]
+
+def _odd_runs ( x ) :
+
+    """
+        Whether all maximal runs of set bits of x have odd length.
+
+        >>> _odd_runs(0b1110100)
+        True
+        >>> _odd_runs(0b1101)
+        False
+
+    """
+
+    while x:
+        low = x & -x
+        run = x & ~(x + low)
+        if not bin(run).count('1') & 1: return False
+        x ^= run
+
+    return True
+
+def has_odd_sides ( h, w, bits ) :
+
+    """
+        Whether all sides of the boundary of cells packed with height h and
+        width w have odd length, in one pass over the columns.
+
+        Sides across columns are the runs of the XOR of consecutive columns.
+        Sides along columns are followed with one parity bit per row: a side
+        continued from the previous column flips its bit, a new side starts
+        odd, and a side must be odd when it stops.
+
+        hyp: the cells are connected and have no holes, so that the boundary
+        has no pinch points and each run is a whole side.
+
+        >>> has_odd_sides(1, 1, 1)
+        True
+        >>> has_odd_sides(1, 2, 0b11)
+        False
+        >>> has_odd_sides(1, 3, 0b111)
+        True
+        >>> has_odd_sides(3, 3, 0b010111010)
+        True
+        >>> has_odd_sides(2, 3, 0b101111)
+        False
+
+    """
+
+    column = (1 << h) - 1
+
+    previous = 0
+    edges = 0 # rows with a side along the line before the current column
+    odd = 0 # rows whose current side along columns has odd length so far
+
+    for j in range(w + 1):
+
+        current = (bits >> (j*h)) & column if j < w else 0
+
+        if not _odd_runs(previous ^ current): return False
+
+        # edges between rows i-1 and i for i = 0, ..., h
+        vertical = (current ^ (current << 1))
+
+        if (edges & ~vertical) & ~odd: return False
+
+        odd = vertical & ~(edges & odd)
+        edges = vertical
+        previous = current
+
+    return not edges & ~odd
+
 def neighbors(cell):
 
     """
@@ -121,8 +383,6 @@ def boundary_cells ( cells ):
 
     kill_count = Counter(chain(*[_neighbors(cell) for cell in cells]))
 
-    debug("kill_count", kill_count)
-
     killed = map(lambda t: t[0], filter(lambda t: t[1] == 4, kill_count.items()))
 
     return cells.difference(killed)
@@ -148,8 +408,6 @@ def boundary ( cells, origin ):
 
     first = origin
 
-    debug("first", first)
-
     # those are coordinates of the lattice
 
     previous = first
@@ -166,14 +424,8 @@ def boundary ( cells, origin ):
 
         assert len(boundary) <= 2 * (n+1)
 
-        debug('boundary', boundary)
-        debug('previous', previous)
-        debug('current', current)
-
         for case, neighbor in enumerate(_neighbors_from_direction(previous, current)):
 
-            debug('neighbor', case, 'is', neighbor)
-
             if case >= 1:
                 x = boundary[-1][0] + neighbor[0] - current[0]
                 y = boundary[-1][1] + neighbor[1] - current[1]
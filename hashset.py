@@ -0,0 +1,145 @@
+"""
+    Open-addressing hash set of nonnegative integer keys stored in an array
+    of machine words, for holding millions of packed polyominoes in a few
+    bytes each instead of one Python object each.
+
+    >>> keys = PackedSet()
+    >>> keys.add(42), keys.add(42), keys.add(0)
+    (True, False, True)
+    >>> sorted(keys), len(keys), 7 in keys
+    ([0, 42], 2, False)
+
+"""
+
+from array import array
+
+WORD = 64
+MASK = (1 << WORD) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+
+class PackedSet:
+
+    """
+        Set of keys of at most words * 64 bits. Each key occupies words
+        consecutive slots of an array('Q'), the empty slot being all zeros,
+        so the key 0 is kept aside. Collisions are resolved by linear
+        probing and the table doubles when it is half full.
+
+        >>> keys = PackedSet(words=2, capacity=2)
+        >>> keys.update(range(1 << 63, (1 << 63) + 100))
+        >>> keys.update([1 << 100, 1 << 100])
+        >>> len(keys), 1 << 100 in keys, 1 << 99 in keys
+        (101, True, False)
+        >>> sorted(keys)[-1] == 1 << 100
+        True
+
+    """
+
+    __slots__ = ('words', '_log', '_table', '_len', '_zero')
+
+    def __init__(self, words=1, capacity=8):
+
+        self.words = words
+        self._log = max(3, (2*capacity - 1).bit_length())
+        self._table = array('Q', bytes(8 * words << self._log))
+        self._len = 0
+        self._zero = False
+
+    def _slot(self, key):
+
+        # first slot of key or of the empty slot where it would go
+        table = self._table
+        words = self.words
+        mask = (1 << self._log) - 1
+        slot = ((hash(key) * GOLDEN) & MASK) >> (WORD - self._log)
+
+        if words == 1:
+            while True:
+                stored = table[slot]
+                if stored == key or not stored: return slot
+                slot = (slot + 1) & mask
+
+        while True:
+            stored = self._load(slot)
+            if stored == key or not stored: return slot
+            slot = (slot + 1) & mask
+
+    def _load(self, slot):
+
+        table = self._table
+        start = slot * self.words
+        key = 0
+        for k in range(self.words):
+            key |= table[start + k] << (k * WORD)
+        return key
+
+    def _store(self, slot, key):
+
+        table = self._table
+        start = slot * self.words
+        for k in range(self.words):
+            table[start + k] = (key >> (k * WORD)) & MASK
+
+    def add(self, key):
+
+        """
+            Add key, return whether it was new.
+        """
+
+        if not key:
+            new = not self._zero
+            self._zero = True
+            return new
+
+        slot = self._slot(key)
+
+        if self.words == 1:
+            if self._table[slot]: return False
+            self._table[slot] = key
+        else:
+            if self._load(slot): return False
+            self._store(slot, key)
+
+        self._len += 1
+
+        if 2 * self._len > 1 << self._log: self._grow()
+
+        return True
+
+    def update(self, keys):
+        for key in keys: self.add(key)
+
+    def _grow(self):
+
+        keys = list(self._nonzero())
+
+        self._log += 1
+        self._table = array('Q', bytes(8 * self.words << self._log))
+
+        for key in keys:
+            slot = self._slot(key)
+            self._store(slot, key)
+
+    def _nonzero(self):
+
+        if self.words == 1:
+            return filter(None, self._table)
+
+        return filter(None, map(self._load, range(1 << self._log)))
+
+    def __contains__(self, key):
+
+        if not key: return self._zero
+
+        slot = self._slot(key)
+
+        return bool(self._table[slot] if self.words == 1 else self._load(slot))
+
+    def __len__(self):
+        return self._len + self._zero
+
+    def __iter__(self):
+
+        if self._zero: yield 0
+
+        yield from self._nonzero()
@@ -6,52 +6,86 @@ https://raw.githubusercontent.com/tesseralis/polyomino/master/polyomino.py
 """
 # from functools import total_ordering
 from grid import _neighbors
-from grid import translate
 from grid import _translate
-from grid import normalize
+from grid import pack
+from grid import unpack
+from grid import children
 from format import draw_grid
 from format import to_repr
-from functools import lru_cache
+from canonical import compact_key
+from canonical import transform_keys
+from canonical import _transform_bits
+from canonical import ROTATIONS
 from functools import total_ordering
 
-@lru_cache(maxsize=10000)
-def _mino_key(n, h, w, cells):
-    #Sort the mino by order, then shape, then 'closeness to top'
-    return (n, h, w, sum(2**(i+j*h) for i, j in cells))
+# transforms that swap the height and the width
+_SWAPPED = frozenset((1, 3, 6, 7))
 
 def mino_key(m):
     """
         Generate a standard key for a polyomino.
     """
-    return _mino_key(m.order, m.height, m.width, m.cells)
+    #Sort the mino by order, then shape, then 'closeness to top'
+    return (m.order, m.height, m.width, m.bits)
 
 @total_ordering
 class Polyomino:
 
     """
-        Represent a fixed polyomino in space as a set of point tuples.
+        Represent a fixed polyomino by its height, width and the bits of its
+        cells packed column by column: cell (i, j) is bit i + j*height. The
+        set of point tuples is only built when cells is accessed.
 
-        hyp: cells is a frozenset
-    """
+        Cells must be normalized and fit in the box, or ValueError is raised.
 
-    def __init__(self, cells, height=None, width=None):
+        >>> Polyomino(frozenset([(0, 0), (1, 0), (1, 1)])).bits
+        11
+        >>> Polyomino(frozenset([(1, 1), (1, 2)]))
+        Traceback (most recent call last):
+        ...
+        ValueError: cells are not normalized in a 2 x 3 box
+
+    """
 
-        self.cells = cells
+    __slots__ = ('bits', 'height', 'width', '_key')
 
-        if height is None or width is None:
-            if cells:
-                rows, cols = zip(*cells)
-                if height is None: height = max(rows)+1
-                if width is None: width = max(cols)+1
-            else:
-                if height is None: height = 0
-                if width is None: width = 0
+    def __init__(self, cells, height=None, width=None):
 
+        if cells:
+            rows, cols = zip(*cells)
+            if height is None: height = max(rows)+1
+            if width is None: width = max(cols)+1
+            if min(rows) != 0 or min(cols) != 0 or max(rows) >= height or max(cols) >= width:
+                raise ValueError('cells are not normalized in a {} x {} box'.format(height, width))
+        else:
+            if height is None: height = 0
+            if width is None: width = 0
+
+        self.bits = pack(height, cells)
         self.height = height
         self.width = width
+        self._key = None
+
+    @classmethod
+    def from_bits(cls, bits, height, width):
+
+        """
+            Build a polyomino from packed cells.
+
+            >>> Polyomino.from_bits(11, 2, 2) == Polyomino(frozenset([(0, 0), (1, 0), (1, 1)]))
+            True
+
+        """
+
+        mino = cls.__new__(cls)
+        mino.bits = bits
+        mino.height = height
+        mino.width = width
+        mino._key = None
+        return mino
 
     def __hash__(self):
-        return self.cells.__hash__()
+        return hash((self.height, self.bits))
 
     def __repr__(self):
         """
@@ -84,88 +118,142 @@ class Polyomino:
         return draw_grid(self)
 
     def __eq__(self, other):
-        return self.cells.__eq__(other.cells)
+        return self.bits == other.bits and self.height == other.height
 
     def __lt__(self, other):
-        return mino_key(self) < mino_key(other)
+        return self.key < other.key
 
     # [properties]
 
+    @property
+    def key(self):
+
+        """
+            mino_key as a single integer, see canonical.compact_key, computed
+            on first use and kept on the instance.
+
+            >>> sorted([singleton, empty, Polyomino(frozenset([(0, 0), (0, 1)]))], key=mino_key) == sorted([singleton, empty, Polyomino(frozenset([(0, 0), (0, 1)]))])
+            True
+
+        """
+
+        key = self._key
+        if key is None:
+            key = self._key = compact_key(self.order, self.height, self.width, self.bits)
+        return key
+
+    @property
+    def cells(self):
+        return frozenset(unpack(self.height, self.bits))
+
     @property
     def order(self):
-        return len(self.cells)
+        return bin(self.bits).count('1')
 
     @property
     def origin(self):
-        for i in range(len(self.cells)):
-            if (0,i) in self.cells:
-                return (0,i)
+        # leftmost cell of the first row
+        h = self.height
+        for j in range(self.width):
+            if self.bits >> (j*h) & 1:
+                return (0,j)
 
     @property
     def corner(self):
-        if not self.cells:
-            return (0,0)
-        rows, cols = zip(*self.cells)
-        return (min(rows), min(cols))
-
-    def translate(self, numrows, numcols):
-        """Translate by numrows and numcols"""
-        return Polyomino(translate(self.cells, numrows, numcols), self.height, self.width)
+        return (0,0)
+
+    def _image(self, t):
+        # image under the transform of index t in transforms, mapped with
+        # the bits of the known box instead of normalizing the cells
+        bits = self.bits
+        table = _transform_bits(self.height, self.width)
+        image = 0
+        while bits:
+            low = bits & -bits
+            image |= table[low.bit_length() - 1][t]
+            bits ^= low
+        if t in _SWAPPED: return Polyomino.from_bits(image, self.width, self.height)
+        return Polyomino.from_bits(image, self.height, self.width)
 
     def rotate_left(self):
         """Rotate counterclockwise"""
-        return Polyomino(normalize([(-j, i) for i, j in self.cells]), self.width, self.height)
+        return self._image(1)
 
     def rotate_half(self):
         """Rotate 180 degrees"""
-        return Polyomino(normalize([(-i, -j) for i, j in self.cells]), self.height, self.width)
+        return self._image(2)
 
     def rotate_right(self):
         """Rotate clockwise"""
-        return Polyomino(normalize([(j, -i) for i, j in self.cells]), self.width, self.height)
+        return self._image(3)
 
     def reflect_vert(self):
         """Reflect vertically"""
-        return Polyomino(normalize([(-i, j) for i, j in self.cells]), self.height, self.width)
+        return self._image(4)
 
     def reflect_horiz(self):
         """Reflect horizontally"""
-        return Polyomino(normalize([(i, -j) for i, j in self.cells]), self.height, self.width)
+        return self._image(5)
 
     def reflect_diag(self):
         """Reflection across line i==j"""
-        return Polyomino(frozenset((j, i) for i, j in self.cells), self.width, self.height)
+        return self._image(6)
 
     def reflect_skew(self):
         """Reflection across line i==-j"""
-        return Polyomino(normalize([(-j, -i) for i, j in self.cells]), self.width, self.height)
+        return self._image(7)
 
     # [Congruent polyominoes]
+    def transforms_keys(self):
+
+        """
+            Keys of the transforms of this mino, in the order of transforms,
+            for callers that only compare them.
+
+            >>> l = Polyomino(frozenset([(0, 0), (1, 0), (1, 1)]))
+            >>> l.transforms_keys() == tuple(map(mino_key, l.transforms()))
+            True
+
+        """
+
+        return transform_keys(self)
+
     def rotations(self):
         """Return rotations of this mino."""
-        return [self,
-                self.rotate_left(),
-                self.rotate_half(),
-                self.rotate_right()]
+        return self.transforms()[:ROTATIONS]
 
     def reflections(self):
         """Return reflections of this mino."""
-        return [self,
-                self.reflect_vert(),
-                self.reflect_horiz(),
-                self.reflect_diag(),
-                self.reflect_skew()]
+        transforms = self.transforms()
+        return [transforms[0]] + transforms[ROTATIONS:]
 
     def transforms(self):
-        """Return transformations of this mino."""
-        return [self,
-                self.rotate_left(),
-                self.rotate_half(),
-                self.rotate_right(),
-                self.reflect_vert(),
-                self.reflect_horiz(),
-                self.reflect_diag(),
-                self.reflect_skew()]
+
+        """
+            Return transformations of this mino, all computed in a single
+            pass over its cells.
+
+            >>> from grid import normalize
+            >>> mino = Polyomino(frozenset([(0, 0), (1, 0), (1, 1), (1, 2)]))
+            >>> cells = mino.cells
+            >>> images = [
+            ...     [(i, j) for i, j in cells],
+            ...     [(-j, i) for i, j in cells],
+            ...     [(-i, -j) for i, j in cells],
+            ...     [(j, -i) for i, j in cells],
+            ...     [(-i, j) for i, j in cells],
+            ...     [(i, -j) for i, j in cells],
+            ...     [(j, i) for i, j in cells],
+            ...     [(-j, -i) for i, j in cells],
+            ... ]
+            >>> [image.cells for image in mino.transforms()] == [frozenset(normalize(image)) for image in images]
+            True
+            >>> mino.reflect_skew() == mino.transforms()[7]
+            True
+
+        """
+
+        return [Polyomino.from_bits(bits, h, w) for _, h, w, bits in transform_keys(self)]
 
     def augment(self, cell):
 
@@ -196,25 +284,20 @@ class Polyomino:
 
     def neighbours(self):
 
+        cells = self.cells
+
         nbrs = set()
 
-        for cell in self.cells: nbrs.update(_neighbors(cell))
+        for cell in cells: nbrs.update(_neighbors(cell))
 
-        return nbrs - self.cells
+        return nbrs - cells
 
 
     def children(self):
         """
         Returns all polyominoes obtained by adding a square to this one.
         """
-        if not self.cells: return {singleton}
-
-        childset = set()
-        # Add each neighbor
-        for nbr in self.neighbours():
-            new = self.augment(nbr)
-            childset.add(new)
-        return childset
+        return set(Polyomino.from_bits(bits, h, w) for h, w, bits in children(self.height, self.width, self.bits))
 
 empty = Polyomino(frozenset(), 0, 0)
 singleton = Polyomino(frozenset([(0,0)]), 1, 1)
@@ -27,3 +27,63 @@ def needed ( targets, wanted ):
         cnt.update(dependencies[target])
 
     return cnt
+
+def groups ( targets, wanted, sources=() ):
+
+    """
+        Partition wanted into groups of targets that share no dependency, so
+        that each group can be computed on its own. Dependencies in sources
+        are recomputed by each group instead of tying groups together.
+
+        >>> from dependencies import targets
+        >>> sorted(map(sorted, groups(targets, ['one-sided', 'chiral', 'A217595'])))
+        [['A217595', 'chiral', 'one-sided']]
+        >>> sorted(map(sorted, groups(targets, ['one-sided', 'chiral', 'A217595'], sources=['fixed'])))
+        [['A217595', 'chiral'], ['one-sided']]
+
+    """
+
+    dependencies = expand(targets)
+
+    parts = [] # pairs of (dependencies, targets)
+
+    for target in wanted:
+
+        closure = (set(dependencies[target]) | {target}) - set(sources)
+        members = {target}
+
+        for part in list(parts):
+            if part[0] & closure:
+                parts.remove(part)
+                closure |= part[0]
+                members |= part[1]
+
+        parts.append((closure, members))
+
+    return [frozenset(members) for closure, members in parts]
+
+def stages ( targets, source, columns ) :
+
+    """
+        The columns that derive from source, each after the column it
+        derives from, as (column, parent) pairs. Every column in columns
+        must derive from a single column.
+
+        >>> from dependencies import targets
+        >>> stages(targets, 'fixed', ['chiral', 'free without holes', 'fixed without holes', 'one-sided'])
+        [('free', 'fixed'), ('one-sided', 'fixed'), ('chiral', 'free'), ('free without holes', 'free')]
+
+    """
+
+    dependencies = expand(targets)
+
+    below = [column for column in columns if column != source and source in dependencies[column]]
+
+    closure = set(below)
+    for column in below:
+        closure.update(key for key in dependencies[column] if key != source and source in dependencies[key])
+
+    # parents come first since they have fewer dependencies
+    ordered = sorted(closure, key=lambda column: (len(dependencies[column]), column))
+
+    return [(column, targets[column][0]) for column in ordered]
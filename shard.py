@@ -0,0 +1,110 @@
+"""
+    Count the fixed polyominoes of an order across independent jobs.
+
+    Each job counts one shard of the Redelmeier search, see
+    enumerate._redelmeier_shard, and writes its counts to a result file.
+    Shards only depend on the order and the number of shards, so a failed
+    shard can be rerun on its own. The results are summed once all shards
+    are there.
+
+    >>> import os, tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> paths = [os.path.join(directory, 'shard-{}.json'.format(i)) for i in range(3)]
+    >>> for i, path in enumerate(paths): run(10, i, 3, path)
+    >>> merge(paths)
+    [1, 1, 2, 6, 19, 63, 216, 760, 2725, 9910, 36446]
+    >>> merge(paths[:2])
+    Traceback (most recent call last):
+    ...
+    ValueError: missing shards [2] of 3
+
+    Usage:
+
+        python shard.py run --order 16 --shard 0 --nshards 8 -o shard-0.json
+        python shard.py merge shard-*.json
+
+"""
+
+from checkpoint import load
+from checkpoint import save
+
+from count import fixed_orders
+from enumerate import _redelmeier_shard_depth
+
+def run ( n, shard, nshards, path, workers=None ) :
+
+    """
+        Count shard of nshards of the search for order n and save the
+        counts to path.
+    """
+
+    counts = fixed_orders(n, workers=workers, shard=shard, nshards=nshards)
+
+    save(path, {
+        'order': n,
+        'depth': _redelmeier_shard_depth(n, nshards) if n else 0,
+        'shard': shard,
+        'nshards': nshards,
+        'counts': counts,
+    })
+
+def merge ( paths ) :
+
+    """
+        Sum the counts of result files after checking that they are for the
+        same search and hold each shard exactly once.
+    """
+
+    results = list(map(load, paths))
+
+    if not results:
+        raise ValueError('no shards to merge')
+
+    search = set((r['order'], r['depth'], r['nshards']) for r in results)
+
+    if len(search) > 1:
+        raise ValueError('shards of different searches {}'.format(sorted(search)))
+
+    (n, _, nshards), = search
+
+    shards = sorted(r['shard'] for r in results)
+
+    duplicates = sorted(set(s for s in shards if shards.count(s) > 1))
+    if duplicates:
+        raise ValueError('duplicate shards {} of {}'.format(duplicates, nshards))
+
+    missing = sorted(set(range(nshards)) - set(shards))
+    if missing:
+        raise ValueError('missing shards {} of {}'.format(missing, nshards))
+
+    return [sum(column) for column in zip(*(r['counts'] for r in results))]
+
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Count fixed polyominoes across independent jobs.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parser_run = subparsers.add_parser('run', help='count one shard')
+    parser_run.add_argument('--order', type=int, required=True, help='order of the polyominoes')
+    parser_run.add_argument('--shard', type=int, required=True, help='index of the shard, from 0')
+    parser_run.add_argument('--nshards', type=int, required=True, help='number of shards')
+    parser_run.add_argument('--workers', type=int, help='number of processes used for this shard')
+    parser_run.add_argument('-o', '--output', required=True, help='result file')
+
+    parser_merge = subparsers.add_parser('merge', help='sum the counts of all shards')
+    parser_merge.add_argument('results', nargs='+', help='result files')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args.order, args.shard, args.nshards, args.output, workers=args.workers)
+
+    else:
+        try:
+            counts = merge(args.results)
+        except ValueError as e:
+            parser.error(str(e))
+        for k, c in enumerate(counts):
+            print(k, c)
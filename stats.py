@@ -0,0 +1,175 @@
+"""
+    Counters and timers for performance triage.
+
+    Instrumentation is off by default and then costs nothing in hot loops:
+    timer returns a shared null context and timed its function untouched,
+    so call sites only pay once per stage, never per polyomino.
+    When enabled, counters and timers accumulate by name, and with a
+    profile directory each timed stage is also run under cProfile.
+
+    >>> enable()
+    >>> add('minos', 5)
+    >>> add('nodes', 3)
+    >>> with timer('stage'): pass
+    >>> report = snapshot()
+    >>> report['counters']
+    {'minos': 5, 'nodes': 3}
+    >>> sorted(report['timers'])
+    ['stage']
+    >>> disable()
+    >>> timer('stage') is timer('other')
+    True
+
+"""
+
+import os
+import json
+import cProfile
+
+from collections import Counter
+from collections import defaultdict
+from contextlib import contextmanager
+from contextlib import nullcontext
+from time import perf_counter
+
+import canonical
+
+ENABLED = False
+
+counters = Counter()
+timers = defaultdict(float)
+
+_profile = None
+_profiles = {}
+
+_NULL = nullcontext()
+
+def enable ( profile=None ) :
+
+    """
+        Reset and enable the counters and timers. If profile is a directory,
+        the timed stages are also profiled there, one file per stage.
+    """
+
+    global ENABLED, _profile
+
+    counters.clear()
+    timers.clear()
+    _profiles.clear()
+
+    ENABLED = True
+    _profile = profile
+
+def disable ( ) :
+
+    global ENABLED, _profile
+
+    ENABLED = False
+    _profile = None
+
+def add ( name, k=1 ) :
+
+    """
+        Add k to a counter. Hot code checks ENABLED before calling.
+    """
+
+    counters[name] += k
+
+def timed ( name, function ) :
+
+    """
+        Function that adds the time of each call of function to a timer and
+        counts its calls, or function itself when disabled.
+
+        >>> enable()
+        >>> square = timed('square', lambda x: x * x)
+        >>> square(3), square(4), counters['square'], 'square' in timers
+        (9, 16, 2, True)
+        >>> disable()
+        >>> abs is timed('abs', abs)
+        True
+
+    """
+
+    if not ENABLED: return function
+
+    def call ( *args ) :
+        start = perf_counter()
+        try:
+            return function(*args)
+        finally:
+            timers[name] += perf_counter() - start
+            counters[name] += 1
+
+    return call
+
+def timer ( name ) :
+
+    """
+        Context that adds the time spent in it to a timer, and profiles it
+        if enabled with a profile directory.
+    """
+
+    if not ENABLED: return _NULL
+
+    return _timer(name)
+
+@contextmanager
+def _timer ( name ) :
+
+    profiler = None
+
+    if _profile is not None:
+        profiler = _profiles.setdefault(name, cProfile.Profile())
+
+    start = perf_counter()
+
+    if profiler is not None: profiler.enable()
+
+    try:
+        yield
+    finally:
+        if profiler is not None: profiler.disable()
+        timers[name] += perf_counter() - start
+
+def snapshot ( ) :
+
+    """
+        Counters, timers and the statistics of the caches.
+    """
+
+    info = canonical.cache_info()
+
+    return {
+        'counters': dict(counters),
+        'timers': dict(timers),
+        'caches': {
+            # each miss computes the keys of all transforms of a polyomino
+            'transform keys': {
+                'hits': info.hits,
+                'misses': info.misses,
+                'transforms': info.misses * canonical.TRANSFORMS,
+                'size': info.currsize,
+            },
+        },
+    }
+
+def dump ( fp ) :
+
+    """
+        Write the snapshot as JSON to a file object.
+    """
+
+    json.dump(snapshot(), fp, indent=2)
+    fp.write('\n')
+
+def dump_profiles ( ) :
+
+    """
+        Write the profile of each stage to the profile directory.
+    """
+
+    os.makedirs(_profile, exist_ok=True)
+
+    for name, profiler in _profiles.items():
+        profiler.dump_stats(os.path.join(_profile, '{}.prof'.format(name.replace(' ', '-'))))
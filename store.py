@@ -0,0 +1,278 @@
+"""
+    Persistent sorted collections of polyominoes of one order.
+
+    A store is a binary file made of a header (magic, version, order, class,
+    record size and count) followed by one fixed-width record per
+    polyomino: its compact key, see canonical.compact_key, big-endian.
+    Records are sorted by mino_key, which is the order of the record bytes,
+    so membership is a binary search on the raw file. Readers mmap the file and only decode the polyominoes they
+    access.
+
+    >>> import os, tempfile
+    >>> from oeis import A000105
+    >>> directory = tempfile.mkdtemp()
+    >>> minos = cached(directory, 6, 'free')
+    >>> len(minos) == A000105[6]
+    True
+    >>> list(minos) == sorted(minos)
+    True
+    >>> all(mino in minos for mino in minos)
+    True
+    >>> minos[0] in minos, minos[0].rotate_left() in minos
+    (True, False)
+    >>> os.listdir(directory)
+    ['free-6.bin']
+    >>> with cached(directory, 6, 'free') as again:
+    ...     again == minos
+    True
+    >>> minos.close()
+
+"""
+
+import os
+import mmap
+import struct
+
+from collections.abc import Sequence
+from collections.abc import Sized
+
+from polyomino import Polyomino
+from canonical import _key_size
+from canonical import split_key
+
+import enumerate
+
+MAGIC = b'POLY'
+VERSION = 2
+HEADER = struct.Struct('<4sBBBBQ')
+
+# records sorted in memory at once when writing a store
+CHUNK = 1 << 16
+
+KINDS = {
+    'fixed': enumerate._fixed,
+    'one-sided': enumerate._one_sided_mem,
+    'free': enumerate._free_mem,
+    'chiral': enumerate._chiral_mem,
+    'fixed without holes': enumerate._fixed_without_holes,
+    'free without holes': enumerate._without_holes_mem,
+}
+
+def _kind ( kind ) :
+
+    try:
+        return tuple(KINDS).index(kind)
+    except ValueError:
+        raise ValueError('unknown class {}'.format(kind))
+
+def _record ( mino, size ) :
+
+    return mino.key.to_bytes(size, 'big')
+
+def write ( path, minos, order, kind, chunk=CHUNK ) :
+
+    """
+        Write the polyominoes of the given order and class to path. Records
+        are streamed from minos, which can be any iterable, including one of
+        the generators of enumerate, and sorted through runs of at most
+        chunk records written next to path, see external.sort. A collection
+        of at most chunk polyominoes is sorted in memory. The file is
+        replaced atomically.
+
+        >>> import os, tempfile
+        >>> from enumerate import _fixed
+        >>> directory = tempfile.mkdtemp()
+        >>> path = os.path.join(directory, 'fixed-7.bin')
+        >>> write(path, _fixed(7), 7, 'fixed', chunk=100)
+        >>> with Store(path) as minos:
+        ...     list(minos) == sorted(_fixed(7))
+        True
+        >>> os.listdir(directory)
+        ['fixed-7.bin']
+
+    """
+
+    import external
+
+    size = _key_size(order)
+    records = (_record(mino, size) for mino in minos)
+
+    if isinstance(minos, Sized) and len(minos) <= chunk:
+        records = sorted(records)
+    else:
+        records = external.sort(records, size, os.path.dirname(path) or '.', chunk)
+
+    write_records(path, records, order, kind)
+
+def write_records ( path, records, order, kind ) :
+
+    """
+        Write an iterable of records of the given order, already sorted and
+        without duplicates, to path. The count in the header is filled in
+        at the end so that records can be streamed. Return the count.
+    """
+
+    size = _key_size(order)
+
+    tmp = path + '.tmp'
+
+    count = 0
+
+    with open(tmp, 'wb') as fp:
+
+        fp.write(HEADER.pack(MAGIC, VERSION, order, _kind(kind), size, 0))
+
+        for record in records:
+            fp.write(record)
+            count += 1
+
+        fp.seek(0)
+        fp.write(HEADER.pack(MAGIC, VERSION, order, _kind(kind), size, count))
+
+    os.replace(tmp, path)
+
+    return count
+
+class Store ( Sequence ) :
+
+    """
+        Read-only sequence of the polyominoes of a store, sorted by
+        mino_key. Stores are equal when they hold the same polyominoes, and
+        unhashable.
+
+        >>> import os, tempfile
+        >>> from polyomino import Polyomino
+        >>> path = os.path.join(tempfile.mkdtemp(), 'minos.bin')
+        >>> l = Polyomino(frozenset([(0, 0), (1, 0), (1, 1)]))
+        >>> i = Polyomino(frozenset([(0, 0), (0, 1), (0, 2)]))
+        >>> write(path, [l, i], 3, 'fixed')
+        >>> with Store(path) as minos:
+        ...     minos.order, minos.kind, len(minos), minos[-1] == l, minos.index(l)
+        (3, 'fixed', 2, True, 1)
+
+    """
+
+    def __init__(self, path):
+
+        with open(path, 'rb') as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, order, kind, record, count = HEADER.unpack_from(self._map)
+
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError('{} is not a polyomino store'.format(path))
+
+        self.order = order
+        self.kind = tuple(KINDS)[kind]
+        self._record = record
+        self._count = count
+
+    def _raw(self, index):
+        start = HEADER.size + index * self._record
+        return self._map[start:start+self._record]
+
+    def _decode(self, raw):
+        _, h, w, bits = split_key(self.order, int.from_bytes(raw, 'big'))
+        return Polyomino.from_bits(bits, h, w)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+
+        if index < 0: index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError('store index out of range')
+
+        return self._decode(self._raw(index))
+
+    def __iter__(self):
+
+        for index in range(self._count):
+            yield self._decode(self._raw(index))
+
+    def _bisect(self, raw):
+
+        lo, hi = 0, self._count
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._raw(mid) < raw: lo = mid + 1
+            else: hi = mid
+
+        return lo
+
+    def __contains__(self, mino):
+        return self.find(mino) is not None
+
+    def find(self, mino):
+
+        """
+            Index of mino in the store or None.
+        """
+
+        if mino.order != self.order: return None
+
+        raw = _record(mino, self._record)
+        index = self._bisect(raw)
+
+        if index < self._count and self._raw(index) == raw: return index
+
+        return None
+
+    def index(self, mino, start=0, stop=None):
+
+        index = self.find(mino)
+
+        if index is None or index < start or (stop is not None and index >= stop):
+            raise ValueError('polyomino not in store')
+
+        return index
+
+    def count(self, mino):
+        return int(mino in self)
+
+    def __eq__(self, other):
+        if not isinstance(other, Store): return NotImplemented
+        return self.order == other.order and self.kind == other.kind and self._map[:] == other._map[:]
+
+    # stores compare by content, which is too large to hash
+    __hash__ = None
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def filename ( directory, n, kind ) :
+
+    """
+        Path of the store of the n-ominoes of the given class in directory.
+    """
+
+    _kind(kind)
+
+    return os.path.join(directory, '{}-{}.bin'.format(kind.replace(' ', '-'), n))
+
+def cached ( directory, n, kind ) :
+
+    """
+        Open the store of the n-ominoes of the given class in directory,
+        enumerating and writing them first if the store does not exist.
+    """
+
+    path = filename(directory, n, kind)
+
+    if not os.path.exists(path):
+        write(path, KINDS[kind](n), n, kind)
+
+    return Store(path)
@@ -0,0 +1,170 @@
+"""
+    Enumeration of the fixed polyominoes that are invariant under a given
+    transform, for counting free and one-sided polyominoes with Burnside's
+    lemma.
+
+    A fixed polyomino invariant under a transform (up to translation) has a
+    unique placement in which the transform is an exact symmetry of the
+    plane about one of a few centers (or axes) and, for reflections, whose
+    first row is row 0. Such a placement is a union of orbits of cells under
+    the symmetry, so we run Redelmeier's algorithm on the graph of orbits and
+    keep the unions that are connected in the plane.
+
+    >>> sorted(map(sorted, _symmetric_cells(4, 'rotate_left')))
+    [[(0, 0), (0, 1), (1, 0), (1, 1)]]
+
+"""
+
+from grid import _neighbors
+from grid import is_connected
+
+SYMMETRIES = ('rotate_left', 'rotate_half', 'reflect_horiz', 'reflect_diag')
+
+def _span ( m, a ) :
+
+    # all i such that |2i - a| <= m
+    return range(-((m - a) // 2), (a + m) // 2 + 1)
+
+def _centers ( n, symmetry ) :
+
+    """
+        For each possible center (or axis) of the symmetry: the transform,
+        the rows and columns a polyomino of order n can span, and whether the
+        polyomino must be anchored on row 0.
+    """
+
+    m = n - 1
+
+    if symmetry == 'rotate_left':
+        # center (a/2, a/2)
+        for a in (0, 1):
+            yield (lambda c, a=a: (c[1], a - c[0])), _span(m, a), _span(m, a), False
+
+    elif symmetry == 'rotate_half':
+        # center (a/2, b/2)
+        for a in (0, 1):
+            for b in (0, 1):
+                yield (lambda c, a=a, b=b: (a - c[0], b - c[1])), _span(m, a), _span(m, b), False
+
+    elif symmetry == 'reflect_horiz':
+        # vertical axis at column a/2
+        for a in (0, 1):
+            yield (lambda c, a=a: (c[0], a - c[1])), range(n), _span(m, a), True
+
+    elif symmetry == 'reflect_diag':
+        # axis i == j
+        yield (lambda c: (c[1], c[0])), range(n), range(n), True
+
+    else:
+        raise ValueError('unknown symmetry {}'.format(symmetry))
+
+def _diameter ( cells ) :
+
+    return max(abs(a[0]-b[0]) + abs(a[1]-b[1]) for a in cells for b in cells)
+
+def _orbits ( transform, rows, cols, n ) :
+
+    """
+        Orbits of the cells of the region under the transform, ordered by
+        their first cell, with the adjacency between orbits. Orbits that no
+        connected n-omino can contain (their cells are too far apart) are
+        left out.
+
+        >>> orbits, adjacency = _orbits(lambda c: (c[0], -c[1]), range(1), range(-1, 2), 3)
+        >>> orbits
+        (((0, -1), (0, 1)), ((0, 0),))
+        >>> adjacency
+        ((1,), (0,))
+
+        >>> _orbits(lambda c: (c[0], -c[1]), range(1), range(-1, 2), 2)
+        ((((0, 0),),), ((),))
+
+    """
+
+    index = {}
+    orbits = []
+
+    for cell in ((i, j) for i in rows for j in cols):
+        if cell in index: continue
+        orbit = [cell]
+        image = transform(cell)
+        while image != cell:
+            orbit.append(image)
+            image = transform(image)
+        if _diameter(orbit) >= n:
+            for x in orbit: index[x] = None
+        else:
+            for x in orbit: index[x] = len(orbits)
+            orbits.append(tuple(sorted(orbit)))
+
+    adjacency = tuple(
+        tuple(sorted(set(index.get(x) for cell in orbit for x in _neighbors(cell)) - {o, None}))
+        for o, orbit in enumerate(orbits)
+    )
+
+    return tuple(orbits), adjacency
+
+def _symmetric_routine ( p, path, untried, seen, orbits, adjacency ) :
+
+    popped = []
+
+    while untried:
+
+        nbr = untried.pop()
+        popped.append(nbr)
+
+        weight = len(orbits[nbr])
+
+        if weight > p: continue
+
+        path.append(nbr)
+
+        if weight == p:
+            cells = set(x for o in path for x in orbits[o])
+            if is_connected(set(cells)):
+                yield cells
+
+        else:
+
+            top = len(untried)
+            child_seen = seen
+
+            for x in adjacency[nbr]:
+                if not child_seen >> x & 1:
+                    child_seen |= 1 << x
+                    untried.append(x)
+
+            yield from _symmetric_routine(p-weight, path, untried, child_seen, orbits, adjacency)
+
+            del untried[top:]
+
+        path.pop()
+
+    popped.reverse()
+    untried.extend(popped)
+
+def _symmetric_cells ( n, symmetry ) :
+
+    """
+        Enumerate the cells of the fixed n-ominoes invariant under the
+        symmetry, one placement per polyomino. The symmetry is one of
+        SYMMETRIES, named after the Polyomino transform that leaves the
+        polyominoes unchanged.
+    """
+
+    if n == 0:
+        yield set()
+        return
+
+    for transform, rows, cols, anchored in _centers(n, symmetry):
+
+        orbits, adjacency = _orbits(transform, rows, cols, n)
+
+        for root, orbit in enumerate(orbits):
+
+            # the root is the first orbit of the polyomino
+            if anchored and orbit[0][0] != rows[0]: break
+
+            seen = (1 << (root + 1)) - 1
+
+            yield from _symmetric_routine(n, [], [root], seen, orbits, adjacency)
@@ -1,15 +1,36 @@
-from itertools import count
-from collections import defaultdict
-
-from debug import debug
+import sys
 
+from itertools import count
+from itertools import islice
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from concurrent.futures import FIRST_COMPLETED
+from functools import lru_cache
+
+from enumerate import _fixed
+from enumerate import _fixed_without_holes
 from enumerate import _fixed_with_offset
-from enumerate import _redelmeier
-from dependencies import filters
+from enumerate import _free_orderly
+from enumerate import _redelmeier_orders
+from external import levels
 from dependencies import targets
-from count import cardinality
+from dependencies import predicates
+from dependencies import sources
+from count import fixed_orders
+from count import METHODS
+from count import _one_sided
+from count import _free
+from count import _chiral
 from online import links
 from scheduling import needed
+from scheduling import expand
+from scheduling import groups
+from scheduling import stages
+from checkpoint import load
+from checkpoint import Periodic
+
+import stats
 
 COLUMNS = (
     "order",
@@ -28,6 +49,14 @@ COLUMNS = (
     "A217595 mem 2",
 )
 
+# columns that can be counted from the number of fixed polyominoes
+COUNTERS = {
+    'fixed': lambda n, fixed_count: fixed_count,
+    'one-sided': _one_sided,
+    'free': _free,
+    'chiral': _chiral,
+}
+
 LONGEST_COLUMN_TITLE = max(map(len, COLUMNS))
 
 FMT = {
@@ -78,12 +107,46 @@ def main (
         format_hline=CSV['hline'],
         format_linkify=CSV['linkify'],
         show_intermediate=False,
+        workers=None,
+        checkpoint=None,
+        checkpoint_interval=60,
+        resume=False,
+        method='redelmeier',
+        jobs=None,
+        timing=False,
+        scratch=None,
+        single_pass=False,
+        breadth_first=False,
+        stats_file=None,
+        profile=None,
         **options
     ) :
 
+    if stats_file is not None or profile is not None:
+        stats.enable(profile)
+
+    try:
+        return _main(min_order, max_order, columns, format_sep, format_title, format_entry,
+                format_newline, format_endline, format_hline, format_linkify, show_intermediate,
+                workers, checkpoint, checkpoint_interval, resume, method, jobs, timing, scratch, single_pass,
+                breadth_first)
+
+    finally:
+        if stats_file == '-':
+            stats.dump(sys.stderr)
+        elif stats_file is not None:
+            with open(stats_file, 'w') as fp:
+                stats.dump(fp)
+        if profile is not None:
+            stats.dump_profiles()
+
+def _main ( min_order, max_order, columns, format_sep, format_title, format_entry,
+        format_newline, format_endline, format_hline, format_linkify, show_intermediate,
+        workers, checkpoint, checkpoint_interval, resume, method, jobs, timing, scratch, single_pass,
+        breadth_first ) :
+
     wanted = frozenset(columns)
     tocompute = needed(targets, columns)
-    debug('tocompute', tocompute)
 
     if show_intermediate:
         wanted = frozenset(tocompute.keys())
@@ -109,9 +172,40 @@ def main (
         hline = HLINE_FMT.format(*(['']*ncols))
         print(hline)
 
+    # checkpoint
+
+    state = {'columns': list(columns), 'rows': {}, 'fixed': None}
+
+    if resume:
+        saved = load(checkpoint)
+        if saved is not None:
+            if saved['columns'] != state['columns']:
+                raise ValueError('checkpoint {} was made for columns {}'.format(checkpoint, saved['columns']))
+            state = saved
+
+    persist = None if checkpoint is None else Periodic(checkpoint, checkpoint_interval)
+
+    def persist_fixed ( search ) :
+        state['fixed'] = search
+        persist(state)
+
+    rows = state['rows']
+
     # entries
 
-    events = entries(min_order, max_order, wanted, tocompute)
+    start = min_order
+    while str(start) in rows: start += 1
+
+    timings = {}
+
+    if jobs is None:
+        events = entries(start, max_order, wanted, tocompute, workers=workers, method=method,
+                fixed_state=state['fixed'],
+                persist_fixed=None if persist is None else persist_fixed,
+                timings=timings, scratch=scratch, single_pass=single_pass,
+                breadth_first=breadth_first)
+    else:
+        events = scheduled(start, max_order, wanted, tocompute, jobs, method=method, timings=timings)
 
     _cache = {}
 
@@ -130,59 +224,273 @@ def main (
 
     for order in orders:
 
+        row = rows.get(str(order), {})
+
         put(format_newline)
 
         for j, kind in enumerate(columns):
             if j > 0: put(format_sep)
-            value = retrieve(order, kind)
+            if kind == 'order': row[kind] = order
+            if kind not in row: row[kind] = retrieve(order, kind)
+            value = row[kind]
+            if timing and (order, kind) in timings:
+                value = _timed(value, timings[(order, kind)])
             put(('{'+format_entry+'}').format(value))
 
         put(format_endline)
         put('\n')
 
-def entries(min_order, max_order, wanted, tocompute):
+        if persist is not None:
+            rows[str(order)] = row
+            persist(state, force=True)
 
-    it = _fixed_with_offset(min_order)
+    return timings
 
-    _cache = {}
+def _timed ( value, seconds ) :
+
+    """
+        Format a count with the time it took and its throughput.
+
+        >>> _timed(1000, 0.5)
+        '1000 (0.5s, 2e+03/s)'
+
+    """
+
+    rate = '{:.3g}/s'.format(value / seconds) if seconds > 0 else '-'
+    return '{} ({:.3g}s, {})'.format(value, seconds, rate)
+
+def _counted ( wanted, tocompute ) :
+
+    """
+        Columns that nothing consumes are counted without enumerating them,
+        which may leave their dependencies without other consumers. Return
+        these columns and what remains to compute.
+    """
+
+    counted = frozenset()
+
+    while True:
+        candidates = frozenset(key for key in wanted if key in COUNTERS and tocompute[key] == 1)
+        if candidates == counted: break
+        counted = candidates
+        tocompute = needed(targets, wanted - counted)
+        tocompute.update(counted)
+
+    return counted, tocompute
+
+def _job ( order, wanted, method ) :
+
+    timings = {}
+    events = entries(order, order, wanted, needed(targets, wanted), method=method, timings=timings)
+    return [(i, kind, value, timings[(i, kind)]) for i, kind, value in islice(events, len(wanted))]
+
+def scheduled(min_order, max_order, wanted, tocompute, jobs, method='redelmeier', timings=None):
+
+    """
+        Same events as entries but computed on a pool of jobs processes. The
+        columns of a row are split into groups that share no dependency
+        other than the fixed polyominoes, which each group generates on its
+        own. Each (order, group) pair is a job. Jobs are submitted in order,
+        a few ahead of the ones running, and events are yielded as soon as
+        their job is done.
+    """
+
+    counted, tocompute = _counted(wanted, tocompute)
+
+    parts = groups(targets, wanted - counted - {'order'}, sources=('fixed',))
+    if counted: parts.append(counted)
+
+    if not parts: return
+
+    if max_order is None:
+        orders = count(min_order)
+    else:
+        orders = range(min_order, max_order+1)
+
+    tasks = ((order, part) for order in orders for part in parts)
 
-    def default_iter ( ) :
-        return lambda key: filters[key](*(_cache[dep] for dep in targets[key]))
+    with ProcessPoolExecutor(jobs) as executor:
 
-    compute_iter = defaultdict(default_iter, {
-        'order': lambda key: i,
-        'fixed': lambda key: next(it) if max_order is not None and max_order > min_order else _redelmeier(i),
-    })
+        pending = set()
 
+        while True:
 
-    def default_list ( ) :
-        return lambda key: list(compute_iter[key](key))
+            for order, part in islice(tasks, 2*jobs - len(pending)):
+                pending.add(executor.submit(_job, order, part, method))
 
-    compute_list = defaultdict(default_list, {
-        'order': lambda key: i,
-    })
+            if not pending: break
 
-    def default_counter ( ) :
-        return lambda key: cardinality(_cache[key])
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                for i, kind, value, seconds in future.result():
+                    if timings is not None: timings[(i, kind)] = seconds
+                    yield (i, kind, value)
+
+def _fused ( minos, root, steps, n ) :
+
+    """
+        Push each polyomino of minos once through the columns of steps,
+        (column, parent) pairs with parents first: a polyomino is in a
+        column when it is in its parent and passes its predicate. Return,
+        for each order k <= n, the number of k-ominoes in each column and in
+        root. Nothing is kept but the counts.
 
-    compute_count = defaultdict(default_counter, {
-        'order': lambda key: _cache[key],
-    })
+        >>> from enumerate import _fixed
+        >>> counts = _fused(_fixed(8), 'fixed', stages(dict(targets, **sources), 'fixed', ['chiral', 'A217595', 'A217595 fixed']), 8)
+        >>> sorted(counts[8].items())
+        [('A217595', 12), ('A217595 fixed', 70), ('chiral', 335), ('fixed', 2725), ('fixed without holes', 2684), ('free', 369), ('free without holes', 363)]
+        >>> counts[7]['fixed']
+        0
+
+    """
+
+    index = {root: 0}
+    compiled = []
+
+    for column, parent in steps:
+        index[column] = len(index)
+        # each filter is timed on its own when stats are enabled
+        predicate = stats.timed('filter ' + column, predicates[column])
+        compiled.append((index[column], index[parent], predicate))
+
+    passed = [True] * len(index)
+    counts = [[0] * len(index) for k in range(n+1)]
+
+    for mino in minos:
+
+        row = counts[mino.order]
+        row[0] += 1
+
+        for k, parent, predicate in compiled:
+            if passed[parent] and predicate(mino):
+                passed[k] = True
+                row[k] += 1
+            else:
+                passed[k] = False
+
+    return [dict(zip(index, row)) for row in counts]
+
+def entries(min_order, max_order, wanted, tocompute, workers=None, method='redelmeier', fixed_state=None, persist_fixed=None, timings=None, scratch=None, single_pass=False, breadth_first=False):
+
+    """
+        Yield (order, column, value) for each wanted column of each row.
+        Counted columns come from the number of fixed polyominoes, see
+        COUNTERS. The other columns are filled in one pass per source: each
+        polyomino of the source is pushed through all the columns that
+        derive from it, see _fused, so that a row takes memory proportional
+        to the depth of the search. With a scratch directory, the fixed
+        polyominoes of each order are read from a store built on disk from
+        the previous order, see external.levels. With breadth_first, they
+        are built in memory from the previous order instead, see
+        enumerate._fixed_with_offset. Otherwise, when only the
+        free polyominoes and the columns below them need the fixed ones, the
+        free polyominoes are enumerated directly, see enumerate._free_orderly.
+
+        With single_pass, the polyominoes of all orders up to max_order come
+        from a single search, see enumerate._redelmeier_orders, which fills
+        all rows at once before the first one is yielded, counted columns
+        included. The cells of such rows are not timed.
+    """
+
+    counted, tocompute = _counted(wanted, tocompute)
+
+    fused = frozenset(tocompute) - counted - {'order'}
+
+    # the free polyominoes come from an orderly search, one per class, when
+    # every column below the fixed ones goes through them: the fixed column
+    # is then counted if wanted, or dropped
+    dependencies = expand(targets)
+    below = [column for column in fused if 'fixed' in dependencies[column] and column != 'fixed']
+    if not single_pass and scratch is None and not breadth_first and 'free' in fused and all('free' in dependencies[column] or column == 'free' for column in below):
+        if 'fixed' in wanted: counted |= {'fixed'}
+        fused -= {'fixed'}
+
+    if counted and not single_pass:
+
+        def fixed_counts ( n ) :
+            if method != 'redelmeier':
+                # only the rows are checkpointed
+                return fixed_orders(n, workers=workers, method=method)
+            resumable = fixed_state is not None and fixed_state['order'] == n
+            return fixed_orders(n, workers=workers,
+                    state=fixed_state if resumable else None,
+                    persist=persist_fixed)
+
+        # the first cell that needs the fixed counts pays for them
+        if max_order is None:
+            fixed_count = lru_cache(maxsize=1)(lambda n: fixed_counts(n)[n])
+        else:
+            fixed_column = lru_cache(maxsize=1)(lambda: fixed_counts(max_order))
+            fixed_count = lambda n: fixed_column()[n]
+
+    # the fixed polyominoes without holes are filtered from the fixed ones
+    # when those are enumerated anyway, or in a single pass since the
+    # pruned search has polyominoes with holes as internal nodes
+    roots = sorted(fused & set(sources))
+    if 'fixed' in roots or single_pass and (roots or counted): roots = ['fixed']
+
+    graph = dict(targets, **sources)
+    passes = [(root, stages(graph, root, fused)) for root in roots]
+
+    it = None
+
+    if scratch is not None: it = levels(min_order, scratch)
+    elif breadth_first: it = _fixed_with_offset(min_order)
+
+    def source ( root, n ) :
+        if root == 'fixed without holes': return _fixed_without_holes(n)
+        if root == 'free': return _free_orderly(n)
+        return _fixed(n) if it is None else next(it)
+
+    if single_pass:
+        with stats.timer('single pass'):
+            rows = [_fused(_redelmeier_orders(max_order), root, steps, max_order) for root, steps in passes]
+        # the counted columns take the fixed counts from the same search
+        fixed_count = lambda n: rows[0][n]['fixed']
 
     for i in count(min_order):
 
+        if 'order' in wanted: yield (i, 'order', i)
+
         for target in COLUMNS:
 
-            if target in tocompute:
+            if target in counted:
+
+                start = perf_counter()
+
+                with stats.timer(target):
+                    value = COUNTERS[target](i, fixed_count(i))
+
+                if timings is not None: timings[(i, target)] = perf_counter() - start
+                yield (i, target, value)
+
+        for p, (root, steps) in enumerate(passes):
+
+            if single_pass:
+                values = rows[p][i]
+                seconds = None
 
-                if tocompute[target] == 1:
-                    _cache[target] = compute_iter[target](target)
+            else:
+                start = perf_counter()
 
-                else:
-                    _cache[target] = compute_list[target](target)
+                with stats.timer(root):
+                    values = _fused(source(root, i), root, steps, i)[i]
 
-                if target in wanted:
-                    yield (i, target, compute_count[target](target))
+                # the columns of a pass share its time
+                seconds = perf_counter() - start
+
+            for target in COLUMNS:
+
+                if target in values:
+
+                    if stats.ENABLED: stats.add(target, values[target])
+
+                    if target in wanted and target not in counted:
+                        if timings is not None and seconds is not None: timings[(i, target)] = seconds
+                        yield (i, target, values[target])
+
+        if i == max_order: return
 
 if __name__ == '__main__':
 
@@ -222,8 +530,46 @@ if __name__ == '__main__':
 
     parser.add_argument('--show-intermediate', action='store_true', help='also print columns for intermediate computations')
 
+    parser.add_argument('--workers', type=int, help='number of processes used to count fixed polyominoes')
+
+    parser.add_argument('--method', choices=METHODS, default='redelmeier', help='method used to count fixed polyominoes')
+
+    parser.add_argument('--checkpoint', help='file where progress is saved')
+    parser.add_argument('--checkpoint-interval', type=float, default=60, help='seconds between two saves of the checkpoint')
+    parser.add_argument('--resume', action='store_true', help='resume from the checkpoint file')
+
+    parser.add_argument('--jobs', type=int, help='number of processes computing rows and columns concurrently')
+    parser.add_argument('--timing', action='store_true', help='print the time and throughput of each cell')
+
+    parser.add_argument('--scratch', help='directory where the fixed polyominoes of each order are built on disk')
+
+    parser.add_argument('--breadth-first', action='store_true', help='build the fixed polyominoes of each order in memory from the previous order')
+
+    parser.add_argument('--single-pass', action='store_true', help='enumerate the polyominoes of all orders in a single search up to the maximum order')
+
+    parser.add_argument('--stats', dest='stats_file', help='file where counters and timers are written as JSON at the end (- for stderr)')
+    parser.add_argument('--profile', help='directory where each counted column and each pass is profiled with cProfile')
+
     parser.add_argument('--columns', nargs='+', default=DEFAULT_COLUMNS, choices=COLUMNS, help='columns of the table')
 
     args = parser.parse_args()
+
+    if args.resume and args.checkpoint is None:
+        parser.error('--resume requires --checkpoint')
+
+    if args.jobs is not None and args.workers is not None:
+        parser.error('--jobs and --workers cannot be combined')
+
+    if args.jobs is not None and args.scratch is not None:
+        parser.error('--jobs and --scratch cannot be combined')
+
+    if args.breadth_first and (args.jobs is not None or args.scratch is not None):
+        parser.error('--breadth-first cannot be combined with --jobs nor --scratch')
+
+    if args.single_pass and (args.max_order is None or args.jobs is not None or args.scratch is not None or args.breadth_first or args.timing):
+        parser.error('--single-pass requires --max-order and cannot be combined with --jobs, --scratch, --breadth-first nor --timing')
+
+    if args.jobs is not None and (args.stats_file is not None or args.profile is not None):
+        parser.error('--stats and --profile only instrument the main process, they cannot be combined with --jobs')
     arguments = vars(args)
     main(**arguments)
@@ -0,0 +1,145 @@
+"""
+    Transfer-matrix counting of fixed polyominoes.
+
+    Polyominoes are built column by column inside horizontal strips of
+    height h, one cell at a time, so that the boundary between processed and
+    unprocessed cells (the frontier) is a broken line of h cells. A state
+    records which frontier cells are occupied and which of them are already
+    connected (the signature), and whether the first and last rows of the
+    strip have been touched. States are hashed into a table that maps them
+    to the number of partial polyominoes of each size.
+
+    A polyomino is counted when its last frontier cell is left behind, which
+    also gives its length. Only strips with height at most the length are
+    processed, the others being transposes.
+
+    >>> from oeis import A001168
+    >>> list(A001168[:15]) == _transfer_counts(14)
+    True
+
+"""
+
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def _relabel ( signature ) :
+
+    """
+        Number the components of a signature by order of first appearance.
+
+        >>> _relabel((0, 3, 3, 0, 1, 3))
+        (0, 1, 1, 0, 2, 1)
+
+    """
+
+    labels = {0: 0}
+    return tuple(labels.setdefault(x, len(labels)) for x in signature)
+
+@lru_cache(maxsize=None)
+def _need ( signature, top, bottom, h, column ) :
+
+    """
+        Lower bound on the number of cells a partial polyomino needs to be
+        completed: reach the first and last rows of the strip, join its
+        components, and be at least h columns long.
+    """
+
+    occupied = [r for r, x in enumerate(signature) if x]
+
+    if not occupied: return 0
+
+    rows = (0 if top else occupied[0]) + (0 if bottom else h - 1 - occupied[-1])
+    components = max(signature) - 1
+    columns = h - 1 - column
+
+    return max(rows, components, columns)
+
+def _strip ( n, h, counts ) :
+
+    """
+        Add to counts[k] the number of fixed k-ominoes, k <= n, of height h
+        and length at least h, counting twice those longer than h.
+    """
+
+    states = {((0,) * h, False, False): {0: 1}}
+
+    column = 0
+
+    while states:
+
+        for r in range(h):
+
+            table = {}
+
+            for (signature, top, bottom), partial in states.items():
+
+                up = signature[r-1] if r > 0 else 0
+                left = signature[r]
+
+                # empty cell
+                empty = signature[:r] + (0,) + signature[r+1:]
+
+                if left and left not in empty:
+                    if any(empty):
+                        # a component was cut from the others
+                        pass
+                    elif top and bottom and column >= h:
+                        weight = 1 if column == h else 2
+                        for k, c in partial.items():
+                            counts[k] += weight * c
+                else:
+                    _add(table, (_relabel(empty), top, bottom), partial, 0, n, h, column)
+
+                # occupied cell
+                if up and left and up != left:
+                    full = tuple(up if x == left else x for x in signature)
+                    full = full[:r] + (up,) + full[r+1:]
+                else:
+                    label = up or left or h + 1
+                    full = signature[:r] + (label,) + signature[r+1:]
+
+                key = (_relabel(full), top or r == 0, bottom or r == h - 1)
+                _add(table, key, partial, 1, n, h, column)
+
+            states = table
+
+        if column == 0:
+            # the first column is not empty
+            states.pop(((0,) * h, False, False), None)
+
+        column += 1
+
+def _add ( table, key, partial, cells, n, h, column ) :
+
+    budget = n - cells - _need(*key, h, column)
+
+    if budget < 0: return
+
+    target = table.setdefault(key, {})
+
+    for k, c in partial.items():
+        if k <= budget:
+            k += cells
+            target[k] = target.get(k, 0) + c
+
+    if not target: del table[key]
+
+def _transfer_counts ( n ) :
+
+    """
+        Count the fixed k-ominoes for all k <= n with the transfer-matrix
+        method.
+
+        >>> _transfer_counts(0)
+        [1]
+        >>> _transfer_counts(4)
+        [1, 1, 2, 6, 19]
+
+    """
+
+    counts = [1] + [0] * n
+
+    for h in range(1, (n + 1) // 2 + 1):
+        _strip(n, h, counts)
+
+    return counts